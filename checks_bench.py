@@ -0,0 +1,79 @@
+import random
+import sys
+import time
+from argparse import ArgumentParser
+sys.path.append('utilities')
+
+from utilities.gsc_trading_data_utils import GSCUtils, GSCChecks
+from utilities.rby_trading_data_utils import RBYUtils, RBYChecks
+from utilities.trading_checks_reference import TradingChecksReference
+
+# Utils, checks and section sizes of each generation. The party section is index 1
+GENERATIONS = {
+    "gsc": (GSCUtils, GSCChecks, [0xA, 0x1BC, 0xC5, 0x181]),
+    "rby": (RBYUtils, RBYChecks, [0xA, 0x1A2, 0xC5]),
+}
+PARTY_SECTION = 1
+
+def skip_per_byte(checks, checker, data):
+    # What the synchronous section loops do for each byte
+    do_checks = not checker.is_identity
+    new_data = list(data)
+    for i in range(len(checker)):
+        cleaned_byte = data[i]
+        if do_checks:
+            cleaned_byte = checker[i](cleaned_byte)
+        new_data[i] = cleaned_byte
+    return new_data
+
+def measure(checks, apply, data, repeat):
+    """
+    Returns the best time per byte, in ns. The checker's state is reset
+    before each pass, outside of the timed part.
+    """
+    checker = checks.checks_map[PARTY_SECTION]
+    best = None
+    for _ in range(repeat):
+        TradingChecksReference.reset(checks)
+        start = time.perf_counter()
+        apply(checks, checker, data)
+        elapsed = time.perf_counter() - start
+        if (best is None) or (elapsed < best):
+            best = elapsed
+    return (best * 1e9) / len(data)
+
+def main(generation, repeat, seed):
+    utils_class, checks_class, lengths = GENERATIONS[generation]
+    utils_class()
+    data = TradingChecksReference.random_section(random.Random(seed), lengths[PARTY_SECTION])
+
+    # The path from before the identity map: every byte goes through
+    # the decorated check, which returns right away with the checks off
+    decorated_off = TradingChecksReference.reference_checks(checks_class, lengths, False)
+    identity_off = checks_class(lengths, False)
+    checks_on = checks_class(lengths, True)
+
+    results = [
+        ("checks off, decorated call per byte", measure(decorated_off, TradingChecksReference.per_byte, data, repeat)),
+        ("checks off, identity map per byte", measure(identity_off, skip_per_byte, data, repeat)),
+        ("checks off, identity map", measure(identity_off, TradingChecksReference.runs, data, repeat)),
+        ("checks on, call per byte", measure(checks_on, TradingChecksReference.per_byte, data, repeat)),
+        ("checks on, runs", measure(checks_on, TradingChecksReference.runs, data, repeat)),
+    ]
+    print(f"{generation.upper()} party section, {len(data)} bytes, best of {repeat} (CPython {sys.version.split()[0]}):")
+    for name, ns in results:
+        print(f"  {name:<38}{ns:8.1f} ns/byte")
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Microbenchmark of the sanity checks over a party section")
+    parser.add_argument("-g", "--generation", dest="generation", default="gsc", choices=GENERATIONS.keys(),
+                        help="Generation whose checks are measured (default: gsc)")
+    parser.add_argument("-r", "--repeat", dest="repeat", default=2000, type=int,
+                        help="Passes over the section, the best one is reported (default: 2000)")
+    parser.add_argument("--seed", dest="seed", default=0, type=int,
+                        help="Seed for the section's random data (default: 0)")
+    args = parser.parse_args()
+    if not args.repeat > 0:
+        parser.error("repeat must be greater than 0")
+
+    main(args.generation, args.repeat, args.seed)
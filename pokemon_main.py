@@ -14,6 +14,9 @@ from utilities.rse_sp_trading import RSESPTrading
 from utilities.websocket_client import PoolTradeRunner, ProxyConnectionRunner
 from utilities.gsc_trading_menu import GSCTradingMenu
 from utilities.gsc_trading_strings import GSCTradingStrings
+from utilities.trading_metrics import TradingMetrics
+from utilities.trading_timeline import TradingTimeline
+from utilities.trading_profiler import TradingProfiler
 
 MULTIBOOT_GBA_PATH = "pokemon_gen3_to_genx_mb.gba"
 
@@ -21,6 +24,10 @@ def main():
     """Main entry point that runs the user menu and selects the correct function."""
     menu = GSCTradingMenu(kill_function)
     menu.handle_menu()
+    TradingMetrics.start(port=menu.metrics_port, path=menu.metrics_file)
+    TradingTimeline.start(path=menu.timeline_file)
+    if menu.profile_file is not None:
+        TradingProfiler(menu.profile_file).start()
 
     link_hardware = None
     try:
@@ -0,0 +1,140 @@
+import os
+import random
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utilities.gsc_trading_data_utils import GSCUtils, GSCChecks
+from utilities.rby_trading_data_utils import RBYUtils, RBYChecks
+from utilities.rse_sp_trading_data_utils import RSESPUtils, RSESPChecks
+from utilities.gsc_trading_jp import GSCJPMailConverter
+from utilities.trading_checks_reference import TradingChecksReference
+
+class TestCheckRuns(unittest.TestCase):
+    """
+    Differential test: apply_checks_to_data must give the same bytes and
+    leave the same checker state as the reference, which calls the
+    decorated single-byte checks one by one.
+    With the sanity checks off, the reference still goes through the
+    decorated checks, so the identity map is compared to what it replaced.
+    Each path gets its own checker, fed the same sections in the same order.
+    """
+    seeds = 100
+    generations = [
+        (GSCUtils, GSCChecks, [0xA, 0x1BC, 0xC5, 0x181]),
+        (RBYUtils, RBYChecks, [0xA, 0x1A2, 0xC5]),
+        ]
+
+    @classmethod
+    def setUpClass(cls):
+        # The data files are loaded relative to the repository's root
+        cls.old_cwd = os.getcwd()
+        os.chdir(ROOT)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.old_cwd)
+
+    state_attributes = ["species_list", "item_list", "moves", "curr_move", "curr_text"]
+
+    def get_state(self, checks):
+        # Some of it only exists once the matching check ran
+        state = [getattr(checks, name, None) for name in self.state_attributes]
+        return [list(value) if isinstance(value, list) else value for value in state]
+
+    def get_paths(self, checks_class, lengths, do_sanity_checks):
+        return [(checks_class(lengths, do_sanity_checks), TradingChecksReference.runs),
+                (TradingChecksReference.reference_checks(checks_class, lengths, do_sanity_checks), TradingChecksReference.per_byte)]
+
+    def apply_all(self, checks, apply, seed):
+        rnd = random.Random(seed)
+        TradingChecksReference.reset(checks)
+        ret = []
+        checkers = list(checks.checks_map) + [checks.single_pokemon_checks_map, checks.moves_checks_map]
+        for checker in checkers:
+            if len(checker) == 0:
+                continue
+            checks.prepare_species_buffer()
+            checks.prepare_patch_sets_buffer()
+            ret += [apply(checks, checker, TradingChecksReference.random_section(rnd, len(checker))), self.get_state(checks)]
+        return ret
+
+    def test_generations(self):
+        for utils_class, checks_class, lengths in self.generations:
+            utils_class()
+            for do_sanity_checks in (True, False):
+                paths = self.get_paths(checks_class, lengths, do_sanity_checks)
+                for seed in range(self.seeds):
+                    with self.subTest(checks=checks_class.__name__, sanity=do_sanity_checks, seed=seed):
+                        results = [self.apply_all(checks, apply, seed) for checks, apply in paths]
+                        self.assertEqual(results[0], results[1])
+
+    def get_error(self, apply, checks, checker, data):
+        TradingChecksReference.reset(checks)
+        try:
+            apply(checks, checker, data)
+        except Exception as e:
+            return type(e).__name__
+        return None
+
+    def get_checked_length(self, checks, checker, data):
+        """
+        Returns how many bytes the reference cleans before it stops.
+        """
+        TradingChecksReference.reset(checks)
+        for i in range(len(checker)):
+            try:
+                checker[i](data[i])
+            except Exception:
+                return i
+        return len(checker)
+
+    def test_rse_valid_sections(self):
+        """
+        RSE's checks map is a copy of GSC's, which the Gen 3 flow doesn't
+        apply. On valid Gen 3 sections it stops at the first stat check,
+        so the bytes before it are compared, and both paths must stop
+        with the same error.
+        """
+        RSESPUtils()
+        lengths = TradingChecksReference.rse_section_sizes
+        for do_sanity_checks in (True, False):
+            paths = self.get_paths(RSESPChecks, lengths, do_sanity_checks)
+            probe = TradingChecksReference.reference_checks(RSESPChecks, lengths, do_sanity_checks)
+            rnd = random.Random(0)
+            for seed in range(self.seeds):
+                data = TradingChecksReference.random_rse_section(rnd)
+                length = self.get_checked_length(probe, probe.checks_map[0], data)
+                results = []
+                for checks, apply in paths:
+                    error = self.get_error(apply, checks, checks.checks_map[0], data)
+                    TradingChecksReference.reset(checks)
+                    cleaned = apply(checks, TradingChecksReference.clip_checker(checks.checks_map[0], length), data[:length])
+                    results += [[error, cleaned, self.get_state(checks)]]
+                with self.subTest(sanity=do_sanity_checks, seed=seed):
+                    self.assertEqual(results[0], results[1])
+                    if not do_sanity_checks:
+                        self.assertEqual(length, len(data))
+
+    def test_japanese_mail(self):
+        GSCUtils()
+        for do_sanity_checks in (True, False):
+            paths = []
+            for checks, apply in self.get_paths(GSCChecks, self.generations[0][2], do_sanity_checks):
+                paths += [(apply, checks, GSCJPMailConverter(checks).mail_checker)]
+            rnd = random.Random(0)
+            for seed in range(self.seeds):
+                data = TradingChecksReference.random_section(rnd, len(paths[0][2]))
+                results = []
+                for apply, checks, checker in paths:
+                    TradingChecksReference.reset(checks)
+                    checks.species_list = [1, 2, 3, 4, 5, 6]
+                    checks.item_list = [1, 2, 3, 4, 5, 6]
+                    results += [[apply(checks, checker, data), self.get_state(checks)]]
+                with self.subTest(sanity=do_sanity_checks, seed=seed):
+                    self.assertEqual(results[0], results[1])
+
+if __name__ == "__main__":
+    unittest.main()
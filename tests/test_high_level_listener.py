@@ -0,0 +1,92 @@
+import os
+import random
+import sys
+import unittest
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utilities.high_level_listener import HighLevelListener
+from utilities.gsc_trading import GSCTradingClient
+from utilities.gsc_trading_strings import GSCTradingStrings
+
+class TestCompression(unittest.TestCase):
+    """
+    Compressed transfers must come back as they were sent,
+    and broken zlib payloads must be rejected, not raised.
+    """
+    invalid = ["", "", None]
+
+    def get_listener(self, compression_enabled=True):
+        listener = HighLevelListener()
+        listener.set_valid_transfers(GSCTradingClient.possible_transfers)
+        listener.set_compressible_transfers(GSCTradingClient.compressible_transfers)
+        if compression_enabled:
+            listener.enable_compression()
+        return listener
+
+    def get_full_data(self):
+        # Mostly empty, like a real save
+        rnd = random.Random(0)
+        return [rnd.choice([0, 0, 0, 0x50, rnd.randrange(0x100)]) for _ in range(0x412)]
+
+    def build_message(self, req_type, payload, compressed=True):
+        data_len = len(payload)
+        if compressed:
+            data_len |= HighLevelListener.COMPRESSED_FLAG
+        return bytearray(list((GSCTradingStrings.send_request + req_type).encode()) + [(data_len >> 8) & 0xFF, data_len & 0xFF] + list(payload))
+
+    def is_compressed(self, message):
+        return ((message[HighLevelListener.LEN_POSITION] << 8) & HighLevelListener.COMPRESSED_FLAG) != 0
+
+    def test_round_trip(self):
+        data = self.get_full_data()
+        message = self.get_listener().prepare_send_data(GSCTradingClient.full_transfer, data)
+        self.assertTrue(self.is_compressed(message))
+        self.assertLess(len(message), len(data))
+        receiver = self.get_listener()
+        ret = receiver.process_received_data(message, None)
+        self.assertEqual(ret[1], GSCTradingClient.full_transfer)
+        self.assertEqual(receiver.recv_dict[GSCTradingClient.full_transfer], data)
+
+    def test_not_compressed(self):
+        data = self.get_full_data()
+        message = self.get_listener(False).prepare_send_data(GSCTradingClient.full_transfer, data)
+        self.assertFalse(self.is_compressed(message))
+        # The server reads these itself
+        for req_type in [GSCTradingClient.pool_transfer, GSCTradingClient.random_data_transfer, GSCTradingClient.version_server_transfer]:
+            length = max(GSCTradingClient.possible_transfers[req_type])
+            message = self.get_listener().prepare_send_data(req_type, [0] * length)
+            with self.subTest(req_type=req_type):
+                self.assertFalse(self.is_compressed(message))
+
+    def assertRejected(self, message):
+        receiver = self.get_listener()
+        self.assertEqual(receiver.process_received_data(message, None), self.invalid)
+        self.assertEqual(receiver.recv_dict, {})
+
+    def test_corrupt_stream(self):
+        payload = bytearray(zlib.compress(bytes(self.get_full_data()), HighLevelListener.COMPRESSION_LEVEL))
+        payload[len(payload) // 2] ^= 0xFF
+        payload[-1] ^= 0xFF
+        self.assertRejected(self.build_message(GSCTradingClient.full_transfer, payload))
+        self.assertRejected(self.build_message(GSCTradingClient.full_transfer, b"not zlib at all"))
+
+    def test_truncated_stream(self):
+        payload = zlib.compress(bytes(self.get_full_data()), HighLevelListener.COMPRESSION_LEVEL)
+        self.assertRejected(self.build_message(GSCTradingClient.full_transfer, payload[:-4]))
+
+    def test_oversized_stream(self):
+        payload = zlib.compress(bytes(0x10000))
+        self.assertRejected(self.build_message(GSCTradingClient.full_transfer, payload))
+        payload = zlib.compress(bytes(self.get_full_data() + [0]))
+        self.assertRejected(self.build_message(GSCTradingClient.full_transfer, payload))
+
+    def test_compressed_server_transfer(self):
+        length = max(GSCTradingClient.possible_transfers[GSCTradingClient.pool_transfer])
+        payload = zlib.compress(bytes(length))
+        self.assertRejected(self.build_message(GSCTradingClient.pool_transfer, payload))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    from utilities.tetris_lobby_server import TetrisLobbyServer, TetrisPlayer, MAX_OUTBOX, MAX_HEIGHT, MIN_LINES, MAX_LINES
+    has_websockets = True
+except ImportError:
+    has_websockets = False
+
+class FakeWebSocket:
+    """
+    Replays the given messages, then closes.
+    """
+    def __init__(self, messages=()):
+        self.messages = list(messages)
+        self.sent = []
+        self.num_closes = 0
+
+    async def send(self, msg):
+        self.sent += [msg]
+
+    async def close(self):
+        self.num_closes += 1
+
+    async def __aiter__(self):
+        for msg in self.messages:
+            yield msg
+            await asyncio.sleep(0)
+
+def get_outbox(player, msg_type):
+    messages = []
+    while not player.outbox.empty():
+        messages += [json.loads(player.outbox.get_nowait())]
+    return [msg for msg in messages if msg["type"] == msg_type]
+
+@unittest.skipUnless(has_websockets, "websockets is not installed")
+class TestTetrisLobbyServer(unittest.TestCase):
+    def run_client(self, messages, in_match=True):
+        """
+        Runs a client's messages through the handler, next to an opponent.
+        Returns the heights the lobby accepted and the lines the opponent got.
+        """
+        async def run():
+            server = TetrisLobbyServer(seed=0)
+            lobby = server.get_lobby("/create")
+            opponent = TetrisPlayer(FakeWebSocket())
+            lobby.add(opponent)
+            lobby.in_match = in_match
+            opponent.alive = in_match
+            heights = []
+            lobby.update = lambda player, height: heights.append(height)
+            await server.handler(FakeWebSocket(messages), "/join/" + lobby.code)
+            return heights, [msg["lines"] for msg in get_outbox(opponent, "lines")]
+        return asyncio.run(run())
+
+    def test_validation(self):
+        register = json.dumps({"type": "register", "name": "test"})
+        messages = [register, "not json", "[1, 2]", "5", json.dumps({"height": 1})]
+        for height in [-1, MAX_HEIGHT + 1, "abc", None, [1], 5, MAX_HEIGHT]:
+            messages += [json.dumps({"type": "update", "height": height})]
+        for lines in [MIN_LINES - 1, MAX_LINES + 1, "x", None, {}, MIN_LINES, MAX_LINES]:
+            messages += [json.dumps({"type": "lines", "lines": lines})]
+        heights, lines = self.run_client(messages)
+        self.assertEqual(heights, [5, MAX_HEIGHT])
+        self.assertEqual(lines, [MIN_LINES, MAX_LINES])
+
+    def test_unregistered(self):
+        heights, lines = self.run_client([json.dumps({"type": "update", "height": 5}),
+                                          json.dumps({"type": "lines", "lines": MIN_LINES})])
+        self.assertEqual(heights, [])
+        self.assertEqual(lines, [])
+
+    def test_lines_outside_of_match(self):
+        heights, lines = self.run_client([json.dumps({"type": "register"}),
+                                          json.dumps({"type": "lines", "lines": MIN_LINES})], in_match=False)
+        self.assertEqual(lines, [])
+
+    def test_full_outbox(self):
+        async def run():
+            server = TetrisLobbyServer(seed=0)
+            lobby = server.get_lobby("/create")
+            ws = FakeWebSocket()
+            player = TetrisPlayer(ws)
+            lobby.add(player)
+            for _ in range(MAX_OUTBOX - player.outbox.qsize()):
+                lobby.send(player, "{}")
+            self.assertFalse(player.dropped)
+            lobby.send(player, "{}")
+            lobby.send(player, "{}")
+            await asyncio.sleep(0)
+            self.assertTrue(player.dropped)
+            self.assertEqual(player.outbox.qsize(), MAX_OUTBOX)
+            self.assertEqual(ws.num_closes, 1)
+        asyncio.run(run())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import sys
+from argparse import ArgumentParser
+sys.path.append('utilities')
+
+from utilities.tetris_link import DEFAULT_FRAMES_PER_POLL
+from utilities.tetris_sim import TetrisBench, DEFAULT_PIECE_TIME, DEFAULT_TIMEOUT
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Tetris load test with simulated Game Boys")
+    parser.add_argument("-n", "--players", dest="players", default=100, type=int,
+                        help="Number of simulated players (default: 100)")
+    parser.add_argument("-l", "--lobby_size", dest="lobby_size", default=2, type=int,
+                        help="Players in each lobby (default: 2)")
+    parser.add_argument("-r", "--rounds", dest="rounds", default=1, type=int,
+                        help="Rounds played in each lobby (default: 1)")
+    parser.add_argument("-s", "--server", dest="server_url", default=None,
+                        help="WebSocket server URL (default: a local server in this process)")
+    parser.add_argument("-p", "--piece_time", dest="piece_time", default=DEFAULT_PIECE_TIME, type=float,
+                        help=f"Seconds between the simulated pieces (default: {DEFAULT_PIECE_TIME})")
+    parser.add_argument("-f", "--frames_per_poll", dest="frames_per_poll", default=DEFAULT_FRAMES_PER_POLL, type=float,
+                        help=f"Game Boy frames between link polls (default: {DEFAULT_FRAMES_PER_POLL})")
+    parser.add_argument("-t", "--timeout", dest="timeout", default=DEFAULT_TIMEOUT, type=float,
+                        help=f"Seconds before the test is stopped (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--seed", dest="seed", default=None, type=int,
+                        help="Seed for the simulated matches and the local server")
+    parser.add_argument("-lt", "--latency", dest="latency", default=0, type=float,
+                        help="Maximum one-way network latency added to each player, in ms (default: 0)")
+    parser.add_argument("-ns", "--no_sync_start", dest="sync_start", action="store_false",
+                        help="Start matches as soon as start_game arrives, to compare the start skew")
+    parser.add_argument("-v", "--verbose", dest="verbose", action="store_true",
+                        help="Print the clients' logs")
+    args = parser.parse_args()
+    if not args.frames_per_poll > 0:
+        parser.error("frames_per_poll must be greater than 0")
+
+    bench = TetrisBench(args.players, args.lobby_size, args.rounds, args.server_url, args.piece_time,
+                        args.frames_per_poll, args.seed, args.timeout, args.verbose, args.sync_start, args.latency / 1000)
+    try:
+        asyncio.run(bench.run())
+    except KeyboardInterrupt:
+        print("\nTest interrupted.")
+    bench.report()
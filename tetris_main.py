@@ -4,7 +4,7 @@ from argparse import ArgumentParser
 sys.path.append('utilities')
 
 from utilities.gb_link_lowlevel import GBLinkLow
-from utilities.tetris_link import TetrisLink, MUSIC_A, MUSIC_B, MUSIC_C, MUSIC_OFF, MUSIC_NEXT
+from utilities.tetris_link import TetrisLink, MUSIC_A, MUSIC_B, MUSIC_C, MUSIC_OFF, MUSIC_NEXT, DEFAULT_FRAMES_PER_POLL
 import websockets
 import time
 
@@ -19,12 +19,10 @@ MUSIC_OPTIONS = {
     'o': MUSIC_OFF,
 }
 
-async def main(server_url):
+async def main(server_url, frames_per_poll, sync_start):
     link = None
+    tetris = None
     try:
-        if not check_internet():
-            return
-
         link = GBLinkLow()
         
         # Interactive menu with server option
@@ -45,12 +43,16 @@ async def main(server_url):
             else:
                 print("Invalid option. Please try again.")
         
+        # A local lobby server (tetris_server.py) doesn't need the internet
+        if server_url == DEFAULT_SERVER and not check_internet():
+            return
+
         host_mode = (mode_choice == 'h')
         lobby_code = None
         if not host_mode:
             lobby_code = input("Enter 4-letter lobby code: ").strip()
 
-        tetris = TetrisLink(link)
+        tetris = TetrisLink(link, frames_per_poll, sync_start)
         if not await tetris.handshake():
             print("Could not handshake with Game Boy.")
             return
@@ -97,6 +99,8 @@ async def main(server_url):
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
+        if tetris:
+            tetris.close()
         if link:
             link.deinit()
         print("Tetris session finished.")
@@ -118,9 +122,15 @@ if __name__ == "__main__":
     parser = ArgumentParser(description="Tetris online client")
     parser.add_argument("-s", "--server", dest="server_url", default=DEFAULT_SERVER,
                         help=f"WebSocket server URL (default: {DEFAULT_SERVER})")
+    parser.add_argument("-f", "--frames_per_poll", dest="frames_per_poll", default=DEFAULT_FRAMES_PER_POLL, type=float,
+                        help=f"Game Boy frames between link polls, 0.5 polls twice per frame (default: {DEFAULT_FRAMES_PER_POLL})")
+    parser.add_argument("-n", "--no_sync_start", dest="sync_start", action="store_false",
+                        help="Start matches as soon as start_game arrives, even if the server schedules them")
     args = parser.parse_args()
+    if not args.frames_per_poll > 0:
+        parser.error("frames_per_poll must be greater than 0")
     
     try:
-        asyncio.run(main(args.server_url))
+        asyncio.run(main(args.server_url, args.frames_per_poll, args.sync_start))
     except KeyboardInterrupt:
         print("\nProgram interrupted.")
@@ -0,0 +1,26 @@
+import asyncio
+import sys
+from argparse import ArgumentParser
+sys.path.append('utilities')
+
+from utilities.tetris_lobby_server import TetrisLobbyServer, DEFAULT_START_DELAY
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8765
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Local Tetris lobby server")
+    parser.add_argument("-H", "--host", dest="host", default=DEFAULT_HOST,
+                        help=f"Address to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument("-p", "--port", dest="port", default=DEFAULT_PORT, type=int,
+                        help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--seed", dest="seed", default=None, type=int,
+                        help="Seed for lobby codes, tiles and garbage, for reproducible tests")
+    parser.add_argument("-d", "--start_delay", dest="start_delay", default=DEFAULT_START_DELAY, type=float,
+                        help=f"Seconds between the host's start and the scheduled match start (default: {DEFAULT_START_DELAY})")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(TetrisLobbyServer(args.seed, args.start_delay).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
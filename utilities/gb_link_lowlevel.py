@@ -1,6 +1,73 @@
+import ctypes
+import fcntl
+import struct
+import time
 import spidev
 import RPi.GPIO as GPIO
 
+# Layout of the kernel's struct spi_ioc_transfer:
+# tx_buf, rx_buf, len, speed_hz, delay_usecs, bits_per_word, cs_change,
+# tx_nbits, rx_nbits, word_delay_usecs, pad
+SPI_IOC_TRANSFER = struct.Struct("=QQIIHBBBBBB")
+SPI_MAX_DELAY_USECS = 0xFFFF
+# The ioctl's size field has 14 bits
+SPI_MAX_TRANSFERS = 0x3FFF // SPI_IOC_TRANSFER.size
+
+def spi_ioc_message(num_transfers: int) -> int:
+    """Equivalent of the kernel's SPI_IOC_MESSAGE(N) macro."""
+    return (1 << 30) | ((num_transfers * SPI_IOC_TRANSFER.size) << 16) | (ord('k') << 8)
+
+class GBLinkSequence:
+    """
+    A list of (byte, delay in seconds) pairs compiled into batched SPI messages.
+    Each byte is its own transfer, and the kernel waits delay_usecs after it,
+    so a whole batch is a single ioctl. Delays which don't fit delay_usecs
+    end the batch and are slept in Python.
+    """
+
+    def __init__(self, pairs, speed_hz: int):
+        self.steps = []
+        batch = []
+        for byte, delay in pairs:
+            delay_usecs = int(round(delay * 1000000))
+            if delay_usecs > SPI_MAX_DELAY_USECS:
+                batch.append((byte, 0))
+                self._add_batch(batch, speed_hz)
+                batch = []
+                self.steps.append(float(delay))
+            else:
+                batch.append((byte, delay_usecs))
+                if len(batch) >= SPI_MAX_TRANSFERS:
+                    self._add_batch(batch, speed_hz)
+                    batch = []
+        self._add_batch(batch, speed_hz)
+
+    def _add_batch(self, batch, speed_hz: int):
+        if not batch:
+            return
+        tx = (ctypes.c_uint8 * len(batch))(*[byte for byte, _ in batch])
+        rx = (ctypes.c_uint8 * len(batch))()
+        tx_addr = ctypes.addressof(tx)
+        rx_addr = ctypes.addressof(rx)
+        message = bytearray(SPI_IOC_TRANSFER.size * len(batch))
+        for i, (_, delay_usecs) in enumerate(batch):
+            SPI_IOC_TRANSFER.pack_into(message, i * SPI_IOC_TRANSFER.size,
+                                       tx_addr + i, rx_addr + i, 1, speed_hz, delay_usecs, 8, 0, 0, 0, 0, 0)
+        # tx and rx are kept alive together with the message pointing to them
+        self.steps.append((spi_ioc_message(len(batch)), message, tx, rx))
+
+    def play(self, fd: int) -> list:
+        """Plays the sequence on the SPI device. Returns the received bytes."""
+        received = []
+        for step in self.steps:
+            if isinstance(step, float):
+                time.sleep(step)
+            else:
+                request, message, tx, rx = step
+                fcntl.ioctl(fd, request, message)
+                received += list(rx)
+        return received
+
 # This class provides the low-level hardware interface for the Game Boy link port
 # using a Raspberry Pi's SPI and GPIO pins.
 
@@ -44,6 +111,14 @@ class GBLinkLow:
     def xfer_list(self, out_list: list):
         """Transfers a list of bytes using hardware SPI."""
         self.spi.xfer2(out_list)
+
+    def compile_sequence(self, pairs) -> GBLinkSequence:
+        """Compiles (byte, delay in seconds) pairs for xfer_sequence."""
+        return GBLinkSequence(pairs, self.spi.max_speed_hz)
+
+    def xfer_sequence(self, sequence: GBLinkSequence) -> list:
+        """Plays a compiled sequence, with the delays timed by the kernel."""
+        return sequence.play(self.spi.fileno())
         
     def xfer_u32(self, out_data: int) -> int:
         """This function is for GBA multiboot and is not used by GB/GBC protocols."""
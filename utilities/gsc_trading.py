@@ -3,8 +3,10 @@ import datetime
 from random import Random
 from .trading_version import TradingVersion
 from .gsc_trading_data_utils import *
-from .gsc_trading_menu import GSCBufferedNegotiator
+from .gsc_trading_menu import GSCBufferedNegotiator, GSCPoolPrefetcher, GSCProgressRenderer
 from .gsc_trading_strings import GSCTradingStrings
+from .trading_metrics import TradingMetrics
+from .trading_timeline import TradingTimeline
 
 class GSCTradingClient:
     """
@@ -14,6 +16,8 @@ class GSCTradingClient:
     """
     base_folder = "useful_data/gsc/"
     full_transfer = "FLL2"
+    full_delta_transfer = "FLD2"
+    full_ack_transfer = "FLA2"
     single_transfer = "SNG2"
     pool_transfer = "POL2"
     moves_transfer = "MVS2"
@@ -25,10 +29,14 @@ class GSCTradingClient:
     negotiation_transfer = "NEG2"
     version_client_transfer = "VEC2"
     version_server_transfer = "VES2"
+    capabilities_transfer = "CAP2"
     random_data_transfer = "RAN2"
     need_data_transfer = "ASK2"
+    delta_hash_len = 8
     possible_transfers = {
         full_transfer: {0x412, 0x40C}, # Sum of special_sections_len - Ver 1.0, 2.0 - 4.0
+        full_delta_transfer: range(delta_hash_len, 0x412), # Hash of the base + Patches, smaller than full_transfer
+        full_ack_transfer: {delta_hash_len}, # Hash of the received full_transfer
         single_transfer: {7, 32}, # Ver 1.0 - 3.0 and 4.0
         pool_transfer: {1 + 0x75 + 1, 1 + 1}, # Counter + Single Pokémon + Egg OR Counter + Fail
         moves_transfer: {1 + 8}, # Counter + Moves
@@ -40,9 +48,11 @@ class GSCTradingClient:
         negotiation_transfer : {1 + 1}, # Counter + Convergence value
         version_client_transfer : {6}, # Client's version value
         version_server_transfer : {6}, # Server's version value
+        capabilities_transfer : {2}, # Client's capability flags - Ver 4.1
         random_data_transfer : {10}, # Random values from server
         need_data_transfer : {1 + 1} # Counter + Whether it needs the other player's data
     }
+    compressible_transfers = {full_transfer, full_delta_transfer, mail_transfer} # Only sent between the two clients
     buffered_value = 0x85
     not_buffered_value = 0x12
     need_data_value = 0x72
@@ -57,11 +67,18 @@ class GSCTradingClient:
         self.fileBasePoolTargetName = base_pool
         self.connection = connection.hll
         self.connection.set_valid_transfers(self.possible_transfers)
+        self.connection.set_compressible_transfers(self.compressible_transfers)
         self.stop_trade = stop_trade
         self.received_one = False
         self.party_reader = party_reader
         self.verbose = verbose
         self.connection.prepare_listener(self.full_transfer, self.on_get_big_trading_data)
+        self.connection.prepare_listener(self.full_delta_transfer, self.on_get_big_trading_data_delta)
+        self.connection.prepare_listener(self.full_ack_transfer, self.on_get_big_trading_data_ack)
+        self.connection.prepare_listener(self.capabilities_transfer, self.on_get_capabilities)
+        self.last_sent_full = None
+        self.last_received_full = None
+        self.other_full_hash = None
         self.trader = trader
         self.own_id = None
         self.other_id = None
@@ -96,9 +113,20 @@ class GSCTradingClient:
         
     def send_client_version(self):
         """
-        Handles sending my own version.
+        Handles sending my own version, and what this client supports.
+        Clients which don't know about capabilities will ignore them.
         """
         self.connection.send_data(self.version_client_transfer, TradingVersion.prepare_version_data())
+        self.connection.send_data(self.capabilities_transfer, TradingVersion.prepare_capabilities_data())
+    
+    def on_get_capabilities(self):
+        """
+        The other client listed what it supports.
+        If it can decompress data, big payloads will be compressed.
+        """
+        capabilities = TradingVersion.read_capabilities_data(self.connection.recv_data(self.capabilities_transfer))
+        if TradingVersion.supports_compression(capabilities):
+            self.connection.enable_compression()
     
     def get_random(self):
         """
@@ -133,6 +161,7 @@ class GSCTradingClient:
             for i in range(4):
                 updating_mon.set_move(i, data[i+1], max_pp=False)
                 updating_mon.set_pp(i, data[i+5])
+            self.trader.other_pokemon.invalidate_fingerprints()
         return val
         
     def send_move_data_only(self):
@@ -269,12 +298,48 @@ class GSCTradingClient:
             self.received_one = True
             self.verbose_print(GSCTradingStrings.received_buffered_data_str)
     
+    def on_get_big_trading_data_delta(self):
+        """
+        Rebuilds the other player's entire trading data from the patches
+        against the last one received. If that's not what the patches
+        were made for, the entire data will be asked for instead.
+        """
+        delta = self.connection.recv_data(self.full_delta_transfer)
+        if (delta is not None) and (self.last_received_full is not None):
+            data = GSCUtilsMisc.apply_delta(self.last_received_full, delta, self.delta_hash_len)
+            if data is not None:
+                self.connection.store_received_data(self.full_transfer, data)
+                self.on_get_big_trading_data()
+    
+    def on_get_big_trading_data_ack(self):
+        """
+        The other player has our entire trading data. The next one
+        can be sent as patches against it.
+        """
+        self.other_full_hash = self.connection.recv_data(self.full_ack_transfer)
+    
+    def ack_big_trading_data(self, data):
+        """
+        Lets the other player know which entire trading data we have.
+        Clients which don't support patches will ignore this.
+        """
+        self.last_received_full = data
+        self.connection.send_data(self.full_ack_transfer, GSCUtilsMisc.get_data_hash(data, self.delta_hash_len))
+    
     def reset_big_trading_data(self):
         """
         Make it so if we need to resend stuff, the buffers are clean.
+        The patches' bases go too, so the next data is sent entirely.
         """
         self.connection.reset_send(self.full_transfer)
         self.connection.reset_recv(self.full_transfer)
+        self.connection.reset_send(self.full_delta_transfer)
+        self.connection.reset_recv(self.full_delta_transfer)
+        self.connection.reset_send(self.full_ack_transfer)
+        self.connection.reset_recv(self.full_ack_transfer)
+        self.last_sent_full = None
+        self.last_received_full = None
+        self.other_full_hash = None
         self.received_one = False
         
     def get_big_trading_data(self, lengths):
@@ -290,17 +355,29 @@ class GSCTradingClient:
             success = False
             data = GSCUtilsLoaders.load_trading_data(self.fileBaseTargetName, lengths)
         else:
+            self.ack_big_trading_data(data)
             data = GSCUtilsMisc.divide_data(data, lengths)
         return data, success
 
     def send_big_trading_data(self, data):
         """
         Handles sending the player's entire trading data.
+        If the other player has acknowledged the previous one,
+        only the patches against it are sent.
         """
         final_data = []
         for i in range(len(data)):
             final_data += data[i]
-        self.connection.send_data(self.full_transfer, final_data)
+        delta = None
+        if (self.last_sent_full is not None) and (len(self.last_sent_full) == len(final_data)) and (self.other_full_hash == GSCUtilsMisc.get_data_hash(self.last_sent_full, self.delta_hash_len)):
+            delta = GSCUtilsMisc.create_delta(self.last_sent_full, final_data, self.delta_hash_len)
+        self.last_sent_full = final_data
+        if (delta is not None) and (len(delta) < len(final_data)):
+            # Keep the entire data around, for when the patches can't be used
+            self.connection.store_data(self.full_transfer, final_data)
+            self.connection.send_data(self.full_delta_transfer, delta)
+        else:
+            self.connection.send_data(self.full_transfer, final_data)
         
     def get_pool_trading_data(self):
         """
@@ -465,10 +542,13 @@ class GSCTrading:
         self.checks = self.get_checks(menu)
         self.comms = self.get_comms(connection, menu)
         self.menu = menu
+        self.verbose = menu.verbose
         self.kill_function = kill_function
         self.extremely_verbose = False
         self.utils_class = self.get_and_init_utils_class()
         self.is_running_compat_3_mode = False
+        self.stream_own_data = False
+        self.progress = GSCProgressRenderer(self.verbose)
         self.max_seconds_between_transfers = 0.8
         self.pre_sleep = pre_sleep
     
@@ -489,7 +569,7 @@ class GSCTrading:
         """
         Print if verbose...
         """
-        GSCUtilsMisc.verbose_print(to_print, self.menu.verbose, end=end)
+        GSCUtilsMisc.verbose_print(to_print, self.verbose, end=end)
 
     def send_predefined_section(self, states_list, die_on_no_data=False):
         """
@@ -543,6 +623,8 @@ class GSCTrading:
         If any byte was dropped, either drop a warning
         or an error depending on kill_on_byte_drops.
         """
+        if TradingMetrics.enabled:
+            TradingMetrics.byte_drops.inc()
         if self.menu.kill_on_byte_drops:
             print(GSCTradingStrings.error_byte_dropped_str)
             self.kill_function()
@@ -580,6 +662,8 @@ class GSCTrading:
         """
         Reads a data section and sends it to the device.
         """
+        start_time = time.monotonic()
+        TradingTimeline.begin("read_section", section=index)
         length = self.get_section_length(index)
         next = self.special_sections_starter[index]
         checker = self.get_checker(index)
@@ -619,16 +703,19 @@ class GSCTrading:
         
         if buffered:
             buf = [next]
+            if send_data is not None:
+                # The whole buffer is known, so clean it in one go
+                cleaned_data = self.checks.apply_checks_to_data(checker, send_data)
             # If the trade is buffered, just send the data from the buffer
             i = 0
             while i < (length-1):
                 if send_data is not None:
-                    next = self.prevent_no_input(checker[i](send_data[i]))
+                    next = self.prevent_no_input(cleaned_data[i])
                     send_data[i] = next
                 next_i = i+1
                 if next_i not in self.fillers[index].keys():
                     next = self.swap_byte(next)
-                    self.verbose_print(GSCTradingStrings.transfer_to_hardware_str.format(index=self.get_printable_index(index), completion=GSCTradingStrings.x_out_of_y_str(next_i, length)), end='')
+                    self.progress.update(self.get_printable_index(index), next_i, length)
                     buf += [next]
                 # Handle fillers
                 else:
@@ -636,17 +723,17 @@ class GSCTrading:
                     filler_val = self.fillers[index][next_i][1]
                     if send_data is not None:
                         for j in range(filler_len):
-                            send_data[next_i + j] = checker[next_i + j](send_data[next_i + j])
+                            send_data[next_i + j] = cleaned_data[next_i + j]
                     buf += ([filler_val] * filler_len)
                     i += (filler_len - 1)
                 i += 1
             
             if send_data is not None:
                 # Send the last byte too
-                next = self.prevent_no_input(checker[length-1](send_data[length-1]))
+                next = self.prevent_no_input(cleaned_data[length-1])
                 send_data[length-1] = next
             self.swap_byte(next)
-            self.verbose_print(GSCTradingStrings.transfer_to_hardware_str.format(index=self.get_printable_index(index), completion=GSCTradingStrings.x_out_of_y_str(length, length)), end='')
+            self.progress.finish(self.get_printable_index(index), length)
             for j in range(self.drop_bytes_checks[2][index]):
                 self.swap_byte(self.no_data)
             other_buf = send_data
@@ -657,6 +744,10 @@ class GSCTrading:
                 buf, other_buf, last_sent = self.synch_exchange_section_new(next, index, length, checker, send_buf)
 
         self.verbose_print(GSCTradingStrings.separate_section_str, end='')
+        if TradingMetrics.enabled:
+            TradingMetrics.sections.inc()
+            TradingMetrics.section_time.observe(time.monotonic() - start_time)
+        TradingTimeline.end()
         return buf, other_buf, last_sent
     
     def synch_synch_section_old(self, index):
@@ -724,6 +815,8 @@ class GSCTrading:
         other_buf = []
         send_buf = [[0,next],[0xFFFF,0xFF],[index]]
         recv_data = {}
+        # With the sanity checks off, skip the checker entirely
+        do_checks = not checker.is_identity
         i = 0
         while i < (length + 1):
             found = False
@@ -739,7 +832,10 @@ class GSCTrading:
                         recv_data = self.get_swappable_bytes(recv_buf, length, index)
                     if i in recv_data.keys() and (i < length):
                         # Clean it and send it
-                        cleaned_byte = self.prevent_no_input(checker[i](recv_data[i]))
+                        cleaned_byte = recv_data[i]
+                        if do_checks:
+                            cleaned_byte = checker[i](cleaned_byte)
+                        cleaned_byte = self.prevent_no_input(cleaned_byte)
                         next_i = i+1
                         # Handle fillers
                         if next_i in self.fillers[index].keys():
@@ -749,11 +845,14 @@ class GSCTrading:
                             send_buf[(next_i)&1][1] = filler_val
                             buf += ([filler_val] * filler_len)
                             for j in range(filler_len):
-                                other_buf += [checker[next_i + j](filler_val)]
+                                if do_checks:
+                                    other_buf += [checker[next_i + j](filler_val)]
+                                else:
+                                    other_buf += [filler_val]
                             i += (filler_len - 1)
                         else:
                             next = self.swap_byte(cleaned_byte)
-                            self.verbose_print(GSCTradingStrings.transfer_to_hardware_str.format(index=self.get_printable_index(index), completion=GSCTradingStrings.x_out_of_y_str(next_i, length)), end='')
+                            self.progress.update(self.get_printable_index(index), next_i, length)
                             # Fillers aren't needed anymore, but their last byte may be needed
                             self.remove_filler(send_buf, i)
                             # This will, in turn, get the next byte
@@ -780,6 +879,8 @@ class GSCTrading:
         buf = [next]
         other_buf = []
         recv_data = {}
+        # With the sanity checks off, skip the checker entirely
+        do_checks = not checker.is_identity
         safety_transfer_amount = self.max_tolerance_bytes - 2
         pos_recv = 0
         i = 0
@@ -801,7 +902,10 @@ class GSCTrading:
                 while pos_recv in recv_data.keys():
                     if pos_recv >= length:
                         break
-                    cleaned_byte = self.prevent_no_input(checker[pos_recv](recv_data[pos_recv]))
+                    cleaned_byte = recv_data[pos_recv]
+                    if do_checks:
+                        cleaned_byte = checker[pos_recv](cleaned_byte)
+                    cleaned_byte = self.prevent_no_input(cleaned_byte)
                     other_buf += [cleaned_byte]
                     pos_recv += 1
                     
@@ -812,7 +916,10 @@ class GSCTrading:
                         for j in range(filler_len):
                             if (pos_recv + j) >= length:
                                 break
-                            other_buf += [checker[pos_recv + j](filler_val)]
+                            if do_checks:
+                                other_buf += [checker[pos_recv + j](filler_val)]
+                            else:
+                                other_buf += [filler_val]
                             added_len += 1
                         pos_recv += added_len
             byte_to_console = self.no_input
@@ -838,7 +945,7 @@ class GSCTrading:
                     if bytes_offset > self.max_tolerance_bytes:
                         self.act_on_bad_data()
                 next = self.swap_byte(byte_to_console)
-                self.verbose_print(GSCTradingStrings.transfer_to_hardware_str.format(index=self.get_printable_index(index), completion=GSCTradingStrings.x_out_of_y_str(i, length)), end='')
+                self.progress.update(self.get_printable_index(index), i, length)
                 last_transfer_time = datetime.datetime.now()
                 send_buf[send_index] = [pos_send, next, index, False, 0]
                 send_index = (send_index + 1) % self.total_send_buf_new_bytes
@@ -861,7 +968,7 @@ class GSCTrading:
 
             if schedule_console:
                 next = self.swap_byte(byte_to_console)
-                self.verbose_print(GSCTradingStrings.transfer_to_hardware_str.format(index=self.get_printable_index(index), completion=GSCTradingStrings.x_out_of_y_str(i, length)), end='')
+                self.progress.update(self.get_printable_index(index), i, length)
                 send_buf[send_index] = [pos_send, next, index, False, 0]
                 send_index = (send_index + 1) % self.total_send_buf_new_bytes
                 pos_send += 1
@@ -871,7 +978,7 @@ class GSCTrading:
             buf += [self.no_data]
         while len(other_buf) < length:
             other_buf += [self.no_data]
-        self.verbose_print(GSCTradingStrings.transfer_to_hardware_str.format(index=self.get_printable_index(index), completion=GSCTradingStrings.x_out_of_y_str(length, length)), end='')
+        self.progress.finish(self.get_printable_index(index), length)
         return buf, other_buf, send_buf
 
     def swap_byte(self, send_data):
@@ -879,10 +986,15 @@ class GSCTrading:
         Swaps a byte with the device. First send, and then receives.
         It's a high level abstraction which emulates how real hardware works.
         """
+        start_time = time.monotonic()
         if not self.pre_sleep:
             self.sleep_func()
         self.sendByte(send_data, self.num_bytes_per_transfer)
         recv = self.receiveByte(self.num_bytes_per_transfer)
+        if TradingMetrics.enabled:
+            TradingMetrics.link_transfers.inc()
+            TradingMetrics.link_bytes.inc(self.num_bytes_per_transfer)
+        TradingTimeline.console_time += time.monotonic() - start_time
         if self.extremely_verbose:
             print(GSCTradingStrings.byte_transfer_str.format(send_data=send_data, recv=recv))
         return recv
@@ -1026,12 +1138,14 @@ class GSCTrading:
         """
         Forces a currently open trade menu to be closed.
         """
+        TradingTimeline.begin("end_trade")
         next = 0
         target = self.stop_trade
         while(next != target):
             next = self.swap_byte(self.stop_trade)
             if(target == self.stop_trade and next == target):
                 target = 0
+        TradingTimeline.end()
                 
     def wait_for_set_of_values(self, next, values):
         """
@@ -1131,10 +1245,12 @@ class GSCTrading:
         It also keeps the device clock running properly.
         """
         received = None
+        wait = TradingTimeline.start_peer_wait()
         while received is None:
             self.sleep_func()
             received = fun()
             self.swap_byte(self.no_input)
+        TradingTimeline.end_peer_wait(wait)
         return received
 
     def attempt_receive(self, fun, max_seconds):
@@ -1143,6 +1259,7 @@ class GSCTrading:
         It also keeps the device clock running properly.
         """
         received = None
+        wait = TradingTimeline.start_peer_wait()
         start = datetime.datetime.now()
         while received is None:
             self.sleep_func()
@@ -1150,6 +1267,7 @@ class GSCTrading:
             self.swap_byte(self.no_input)
             if (datetime.datetime.now() - start).total_seconds() > max_seconds:
                 break
+        TradingTimeline.end_peer_wait(wait)
         return received
     
     def reset_trade(self):
@@ -1186,6 +1304,7 @@ class GSCTrading:
 
         while not trade_completed:
             # Get the choice
+            TradingTimeline.begin("choice")
             next = self.no_input
             sent_mon = self.wait_for_choice(next)
 
@@ -1210,6 +1329,7 @@ class GSCTrading:
 
             if not self.is_choice_stop(received_choice) and not self.is_choice_stop(sent_mon):
                 # Send the other player's choice to the game
+                TradingTimeline.begin("accept")
                 next = self.swap_byte(received_choice)
 
                 # Get whether the trade was declined or not
@@ -1262,6 +1382,7 @@ class GSCTrading:
                     self.check_reset_trade(to_server)
 
                     # Conclude the trade successfully
+                    TradingTimeline.begin("success")
                     success_result = self.wait_for_success(next, success_set)
 
                     # Send it to the other player
@@ -1273,6 +1394,10 @@ class GSCTrading:
                     self.force_receive(self.comms.get_success)
 
                     trade_completed = True
+                    if TradingMetrics.enabled:
+                        TradingMetrics.trades.inc()
+                    TradingTimeline.end()
+                    TradingTimeline.next_trade()
                     next = self.swap_byte(success_list[0])
                     next = self.wait_for_no_data(next, success_list[0], limit_resends=self.resends_limit_trade)
                     if(next == self.no_data):
@@ -1298,22 +1423,28 @@ class GSCTrading:
                     next = self.wait_for_no_data(next, received_choice, limit_resends=self.resends_limit_trade)
                     if(next == self.no_data):
                         next = self.wait_for_no_input(next)
+        TradingTimeline.end()
 
     def enter_room(self):
         """
         Makes it so the device can enter the trading room.
         """
+        TradingTimeline.begin("enter_room")
         self.verbose_print(GSCTradingStrings.enter_trading_room_str)
         self.send_predefined_section(self.enter_room_states)
         self.verbose_print(GSCTradingStrings.entered_trading_room_str)
+        TradingTimeline.end()
     
     def sit_to_table(self):
         """
         Handles the device sitting at the table.
         """
+        TradingTimeline.begin("sit_to_table")
         if self.exit_or_new:
             self.verbose_print(GSCTradingStrings.sit_table_str)
-        return self.send_predefined_section(self.start_trading_states, die_on_no_data=True)
+        ret = self.send_predefined_section(self.start_trading_states, die_on_no_data=True)
+        TradingTimeline.end()
+        return ret
         
     def trade_starting_sequence(self, buffered, send_data = [None, None, None, None]):
         """
@@ -1329,6 +1460,7 @@ class GSCTrading:
         send_data[0] = self.utils_class.base_random_section
         just_sent = None
         self.is_running_compat_3_mode = True
+        TradingTimeline.begin("version_exchange")
         self.comms.send_client_version()
         server_version = self.attempt_receive(self.comms.get_server_version, 5)
         if server_version is not None:
@@ -1336,6 +1468,7 @@ class GSCTrading:
             other_client_version = self.attempt_receive(self.comms.get_client_version, 5)
             if other_client_version is not None:
                 self.is_running_compat_3_mode = False
+        TradingTimeline.end()
         
         if self.is_running_compat_3_mode:
             random_data, random_data_other, just_sent = self.read_section(0, send_data[0], buffered, just_sent, 0)
@@ -1352,6 +1485,11 @@ class GSCTrading:
         pokemon_own_mail = pokemon_own.party_has_mail()
         pokemon_other_mail = pokemon_other.party_has_mail()
         
+        # Without mail, the mail section can't change the trading data.
+        # Let the other player have it right away
+        if self.stream_own_data and not pokemon_own_mail:
+            self.send_own_buffered_data(pokemon_own)
+        
         # Trade mail data only if needed
         if (pokemon_own_mail or pokemon_other_mail) or buffered:
             send_data[3] = self.convert_mail_data(send_data[3], True)
@@ -1406,11 +1544,21 @@ class GSCTrading:
             data = self.other_pokemon.create_trading_data(self.special_sections_len)
             valid = True
             self.verbose_print(GSCTradingStrings.recycle_data_str)
+        self.stream_own_data = True
         data, data_other = self.trade_starting_sequence(True, send_data=data)
         self.own_pokemon = self.party_reader(data[1], data_mail=data[2])
         self.other_pokemon = self.party_reader(data_other[1], data_mail=data_other[2])
-        self.comms.send_big_trading_data(self.own_pokemon.create_trading_data(self.special_sections_len))
+        if self.stream_own_data:
+            self.send_own_buffered_data(self.own_pokemon)
         return valid
+    
+    def send_own_buffered_data(self, party):
+        """
+        Sends the player's trading data to the other player,
+        as soon as it's complete.
+        """
+        self.stream_own_data = False
+        self.comms.send_big_trading_data(party.create_trading_data(self.special_sections_len))
 
     def player_trade(self, buffered):
         """
@@ -1430,6 +1578,7 @@ class GSCTrading:
         while True:
             # Wait for the player to sit to the table
             if not self.sit_to_table():
+                self.progress.stop()
                 break
 
             # If necessary, start a normal transfer
@@ -1477,15 +1626,24 @@ class GSCTrading:
         self.exit_or_new = True
         # Start of what the player sees. Enters the room
         self.enter_room()
+        prefetcher = None
         while True:
+            # Get data from the server while the player walks to the table
+            if self.other_pokemon is None:
+                self.verbose_print(GSCTradingStrings.pool_receive_data_str)
+                prefetcher = GSCPoolPrefetcher(self.comms, self.sleep_func)
+                prefetcher.start()
+
             # Wait for the player to sit to the table
             if not self.sit_to_table():
+                if prefetcher is not None:
+                    prefetcher.stop()
+                self.progress.stop()
                 break
 
-            # Get data from the server and then use it to start the trade
+            # Use the server's data to start the trade
             if self.other_pokemon is None:
-                self.verbose_print(GSCTradingStrings.pool_receive_data_str)
-                self.other_pokemon = self.force_receive(self.comms.get_pool_trading_data)
+                self.other_pokemon = self.force_receive(prefetcher.get_prefetched)
             else:
                 self.verbose_print(GSCTradingStrings.pool_recycle_data_str)
             data, data_other = self.trade_starting_sequence(True, send_data=self.other_pokemon.create_trading_data(self.special_sections_len))
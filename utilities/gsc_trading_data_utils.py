@@ -1,5 +1,8 @@
 import math
 import sys
+import bisect
+import hashlib
+from array import array
 from .gsc_trading_strings import GSCTradingStrings
 
 class GSCUtilsLoaders:
@@ -16,11 +19,13 @@ class GSCUtilsLoaders:
         return dict
 
     def prepare_exp_lists(lines):
-        exp_lists = [[], [], [], [], [], []]
+        # Contiguous tables, so they can be searched with bisect.
+        # Signed, since some growth groups start below 0
+        exp_lists = [array('l'), array('l'), array('l'), array('l'), array('l'), array('l')]
         for i in range(GSCUtils.max_level):
             columns = lines[i].split()
             for j in range(6):
-                exp_lists[j] += [int(columns[j])]
+                exp_lists[j].append(int(columns[j]))
         return exp_lists
     
     def read_text_file(target):
@@ -91,12 +96,52 @@ class GSCUtilsLoaders:
             ret[i] = data[(i)*num_stats:(i+1)*num_stats]
         return ret
 
+    def prepare_stat_bases(base_stats, conv_table):
+        """
+        Reorders each species' base stats by stat id.
+        """
+        ret = [None] * len(base_stats)
+        for i in range(len(base_stats)):
+            ret[i] = tuple([base_stats[i][conv_table[j]] for j in range(len(conv_table))])
+        return ret
+
+    def prepare_stat_exp_contributions(contribution_function):
+        """
+        Precalculates the contribution of every possible stat exp value.
+        """
+        ret = array('H', bytes(0x10000 * 2))
+        for i in range(0x10000):
+            ret[i] = contribution_function(i)
+        return ret
+
     def prepare_functions_map(data, functions):
         call_map = [None] * len(data)
         for i in range(len(data)):
             call_map[i] = functions[data[i]]
         return call_map
 
+    def prepare_check_runs(data, functions, run_functions):
+        """
+        Groups consecutive positions which use the same check into runs.
+        Runs whose check can clean a whole slice at once get that
+        function, the others go through the single-byte checks.
+        """
+        runs = []
+        start = 0
+        for i in range(1, len(data) + 1):
+            if i == len(data) or data[i] != data[start]:
+                runs += [(start, i, run_functions.get(functions[data[start]], None))]
+                start = i
+        return runs
+
+    def prepare_translation_table(check_list, default_value):
+        ret = bytearray(0x100)
+        for i in range(0x100):
+            ret[i] = i
+            if check_list[i]:
+                ret[i] = default_value
+        return bytes(ret)
+
     def load_trading_data(target, lengths):
         data = None
         try:
@@ -144,6 +189,8 @@ class GSCUtils:
     evolution_ids = None
     mail_ids = None
     base_stats = None
+    stat_bases = None
+    stat_exp_contributions = None
     pokemon_names = None
     no_mail_section = None
     moves_pp_list = None
@@ -159,6 +206,8 @@ class GSCUtils:
         curr_class.no_mail_section = GSCUtilsMisc.read_data(self.get_path(curr_class.no_mail_path))
         curr_class.base_random_section = GSCUtilsMisc.read_data(self.get_path(curr_class.base_random_path))
         curr_class.base_stats = GSCUtilsLoaders.prepare_stats(GSCUtilsMisc.read_data(self.get_path(curr_class.base_stats_path)), curr_class.num_stats, curr_class.num_entries)
+        curr_class.stat_bases = GSCUtilsLoaders.prepare_stat_bases(curr_class.base_stats, curr_class.stat_id_base_conv_table)
+        curr_class.stat_exp_contributions = GSCUtilsLoaders.prepare_stat_exp_contributions(curr_class.get_stat_exp_contribution)
         curr_class.pokemon_names = GSCUtilsLoaders.text_to_bytes(self.get_path(curr_class.pokemon_names_path), self.get_path(curr_class.text_conv_path))
         curr_class.moves_pp_list = GSCUtilsMisc.read_data(self.get_path(curr_class.moves_pp_list_path))
         curr_class.learnsets = GSCUtilsLoaders.prepare_learnsets(GSCUtilsMisc.read_data(self.get_path(curr_class.learnset_evos_path)))
@@ -170,26 +219,27 @@ class GSCUtils:
         return self.base_folder + target
     
     def get_level_exp(species, exp, utils_class):
-        start = utils_class.min_level
-        end = utils_class.max_level
-        if exp < utils_class.get_exp_level(species, start + 1, utils_class):
-            return start
-        if exp >= utils_class.get_exp_level(species, end, utils_class):
-            return end
-        end_search = False
-        while not end_search:
-            check_level = math.floor((start+end)/2)
-            level_exp = utils_class.get_exp_level(species, check_level, utils_class)
-            next_level_exp = utils_class.get_exp_level(species, check_level + 1, utils_class)
-            if exp < level_exp:
-                end = check_level
-            elif exp > next_level_exp:
-                start = check_level
-            elif exp == next_level_exp:
-                return check_level + 1
-            else:
-                return check_level
-        return utils_class.max_level
+        # The number of levels whose experience is <= exp is the level
+        level = bisect.bisect_right(utils_class.exp_lists[utils_class.exp_groups[species]], exp)
+        if level < utils_class.min_level:
+            return utils_class.min_level
+        if level > utils_class.max_level:
+            return utils_class.max_level
+        return level
+    
+    def get_levels_exp(species_list, exp_list, utils_class):
+        """
+        Returns the levels of multiple pokémon (i.e. a whole party)
+        from their species and experience.
+        """
+        exp_lists = utils_class.exp_lists
+        exp_groups = utils_class.exp_groups
+        min_level = utils_class.min_level
+        max_level = utils_class.max_level
+        levels = [0] * len(species_list)
+        for i in range(len(species_list)):
+            levels[i] = min(max(bisect.bisect_right(exp_lists[exp_groups[species_list[i]]], exp_list[i]), min_level), max_level)
+        return levels
     
     def get_exp_level(species, level, utils_class):
         return utils_class.exp_lists[utils_class.exp_groups[species]][level-1]
@@ -208,7 +258,7 @@ class GSCUtils:
         return stat_exp[utils_class.stat_id_exp_conv_table[stat_id]]
     
     def get_base_stat(species, stat_id, utils_class):
-        return utils_class.base_stats[species][utils_class.stat_id_base_conv_table[stat_id]]
+        return utils_class.stat_bases[species][stat_id]
 
     def get_stat_exp_contribution(stat_exp):
         val = math.ceil(math.sqrt(stat_exp))
@@ -217,10 +267,10 @@ class GSCUtils:
         return math.floor(val / 4)
     
     def stat_calculation(stat_id, species, ivs, stat_exp, level, utils_class, do_exp=True):
-        inter_value = (utils_class.get_base_stat(species, stat_id, utils_class) + utils_class.get_iv(ivs, stat_id, utils_class)) * 2
+        inter_value = (utils_class.stat_bases[species][stat_id] + utils_class.get_iv(ivs, stat_id, utils_class)) * 2
         if do_exp:
-            inter_value += utils_class.get_stat_exp_contribution(utils_class.get_exp(stat_exp, stat_id, utils_class))
-        inter_value = math.floor((inter_value*level)/100)
+            inter_value += utils_class.stat_exp_contributions[utils_class.get_exp(stat_exp, stat_id, utils_class)]
+        inter_value = (inter_value*level) // 100
         return inter_value + utils_class.final_stat_calc_step(stat_id, level, utils_class)
     
     def is_item_mail(item):
@@ -447,6 +497,54 @@ class GSCUtilsMisc:
             return data
         return default_data
     
+    def get_data_hash(data, hash_len):
+        return list(hashlib.sha256(bytes(data)).digest()[:hash_len])
+    
+    def create_delta(base, data, hash_len, merge_distance=3, max_patch_len=0xFF):
+        """
+        Returns the patches which turn base into data, preceded by
+        the hash of base. Each patch is its position (2 bytes),
+        its length (1 byte) and the new bytes.
+        """
+        delta = GSCUtilsMisc.get_data_hash(base, hash_len)
+        i = 0
+        while i < len(data):
+            if base[i] == data[i]:
+                i += 1
+                continue
+            # Extend the patch while the differences are close enough
+            end = i + 1
+            last_diff = i
+            while (end < len(data)) and ((end - i) < max_patch_len) and ((end - last_diff) <= merge_distance):
+                if base[end] != data[end]:
+                    last_diff = end
+                end += 1
+            end = last_diff + 1
+            delta += [(i >> 8) & 0xFF, i & 0xFF, end - i] + data[i:end]
+            i = end
+        return delta
+    
+    def apply_delta(base, delta, hash_len):
+        """
+        Applies the patches from create_delta to base.
+        Returns None if they were made for another base.
+        """
+        if delta[:hash_len] != GSCUtilsMisc.get_data_hash(base, hash_len):
+            return None
+        data = list(base)
+        pos = hash_len
+        while pos < len(delta):
+            if (pos + 3) > len(delta):
+                return None
+            start = (delta[pos] << 8) | delta[pos + 1]
+            length = delta[pos + 2]
+            pos += 3
+            if ((start + length) > len(data)) or ((pos + length) > len(delta)):
+                return None
+            data[start:start + length] = delta[pos:pos + length]
+            pos += length
+        return data
+    
     def verbose_print(to_print, verbose, end='\n'):
         if verbose:
             print(to_print, end=end)
@@ -479,6 +577,15 @@ class GSCTradingText:
             return True
         return False
     
+    def get_fingerprint(self):
+        """
+        Returns the text up to its terminator.
+        Texts for which values_equal is True share it.
+        """
+        if self.utils_class.end_of_line in self.values:
+            return tuple(self.values[:self.values.index(self.utils_class.end_of_line)])
+        return tuple(self.values)
+    
 class GSCTradingPartyInfo:
     """
     Class which contains information about the party size and species
@@ -632,6 +739,16 @@ class GSCTradingPokémonInfo:
         self.set_exp(self.utils_class.get_exp_level(self.get_species(), val, self.utils_class))
         self.update_stats()
     
+    def update_level(self, val):
+        """
+        Sets the level the experience gives, without changing the experience.
+        """
+        self.values[self.level_pos] = val
+        self.update_stats()
+    
+    def get_exp(self):
+        return (self.values[self.exp_pos] << 0x10) | (self.values[self.exp_pos+1] << 8) | self.values[self.exp_pos+2]
+    
     def set_exp(self, val):
         self.values[self.exp_pos] = (val >> 0x10) & 0xFF
         self.values[self.exp_pos+1] = (val >> 8) & 0xFF
@@ -643,8 +760,12 @@ class GSCTradingPokémonInfo:
         """
         old_max_hps = self.get_max_hp()
         old_current_hps = self.get_curr_hp()
+        species = self.get_species()
+        ivs = self.get_ivs()
+        stat_exp = self.get_stat_exp()
+        level = self.get_level()
         for i in range(self.utils_class.num_stats):
-            GSCUtilsMisc.write_short(self.values, self.stats_pos + (i * 2), self.utils_class.stat_calculation(i, self.get_species(), self.get_ivs(), self.get_stat_exp(), self.get_level(), self.utils_class))
+            GSCUtilsMisc.write_short(self.values, self.stats_pos + (i * 2), self.utils_class.stat_calculation(i, species, ivs, stat_exp, level, self.utils_class))
         new_max_hps = self.get_max_hp()
         old_current_hps += new_max_hps-old_max_hps
         GSCUtilsMisc.write_short(self.values, self.curr_hp_pos, min(max(0, old_current_hps), new_max_hps))
@@ -695,6 +816,21 @@ class GSCTradingPokémonInfo:
                     return False
         return True
     
+    def get_fingerprint(self, weak=False):
+        """
+        Returns a hashable value which is the same for any two
+        pokémon for which is_equal would be True.
+        """
+        values = []
+        for i in self.no_moves_equality_ranges:
+            values += self.values[i.start:i.stop]
+        fingerprint = (tuple(values), tuple(sorted([self.get_move(i) for i in range(4)])))
+        if not weak:
+            fingerprint += (self.ot_name.get_fingerprint(), self.nickname.get_fingerprint())
+            if self.has_mail() and (self.mail is not None):
+                fingerprint += (self.mail.get_fingerprint(), self.mail_sender.get_fingerprint())
+        return fingerprint
+    
     def get_same_moves(self):
         """
         Returns for each index the list of indexes with the same move.
@@ -808,6 +944,7 @@ class GSCTradingData:
         self.party_info = self.party_generator(data_pokemon, self.trading_party_info_pos)
         self.trader_info = self.trainer_info_generator(data_pokemon, self.trader_info_pos)
         self.pokemon = []
+        self.fingerprint_index = None
         if do_full:
             for i in range(self.get_party_size()):
                 self.pokemon += [self.mon_generator(data_pokemon, self.trading_pokemon_pos + i * self.trading_pokemon_length)]
@@ -816,6 +953,7 @@ class GSCTradingData:
                 if data_mail is not None and self.pokemon[i].has_mail():
                     self.pokemon[i].add_mail(data_mail, self.trading_pokemon_mail_pos + i * self.trading_mail_length)
                     self.pokemon[i].add_mail_sender(data_mail, self.trading_pokemon_mail_sender_pos + i * self.trading_mail_sender_length)
+            self.update_levels()
     
     def mon_generator(self, data, pos):
         return self.mon_generator_class()(data, pos)
@@ -851,17 +989,63 @@ class GSCTradingData:
     def get_last_mon_index(self):
         return self.get_party_size()-1
     
+    def get_levels_from_exp(self):
+        """
+        Returns the level each pokémon in the party has,
+        according to its experience.
+        """
+        species_list = [0] * len(self.pokemon)
+        exp_list = [0] * len(self.pokemon)
+        for i in range(len(self.pokemon)):
+            species_list[i] = self.pokemon[i].get_species()
+            exp_list[i] = self.pokemon[i].get_exp()
+        return self.utils_class.get_levels_exp(species_list, exp_list, self.utils_class)
+    
+    def update_levels(self):
+        """
+        Makes each pokémon's level match its experience, like the games do.
+        The stats of the ones which change are recalculated.
+        """
+        levels = self.get_levels_from_exp()
+        for i in range(len(self.pokemon)):
+            if (not self.is_mon_egg(i)) and (self.pokemon[i].get_level() != levels[i]):
+                self.pokemon[i].update_level(levels[i])
+    
+    def get_search_key(self, fingerprint, is_egg):
+        return (fingerprint, is_egg)
+    
+    def invalidate_fingerprints(self):
+        """
+        Must be called whenever a pokémon in the party changes.
+        """
+        self.fingerprint_index = None
+    
+    def get_fingerprint_index(self):
+        """
+        Returns the party indexes for each strong and weak fingerprint.
+        It's built the first time it's needed after a change.
+        """
+        if self.fingerprint_index is None:
+            self.fingerprint_index = [{}, {}]
+            for i in range(self.get_party_size()):
+                for weak in [False, True]:
+                    key = self.get_search_key(self.pokemon[i].get_fingerprint(weak=weak), self.is_mon_egg(i))
+                    if key not in self.fingerprint_index[weak]:
+                        self.fingerprint_index[weak][key] = []
+                    self.fingerprint_index[weak][key] += [i]
+        return self.fingerprint_index
+    
     def search_for_mon(self, mon, is_egg):
         """
         Returns None if a provided pokémon is not in the party.
         Otherwise, it returns their index.
         """
-        for i in range(self.get_party_size()):
-            if mon.is_equal(self.pokemon[i]) and (self.is_mon_egg(i) == is_egg):
-                return i
-        for i in range(self.get_party_size()):
-            if mon.is_equal(self.pokemon[i], weak=True) and (self.is_mon_egg(i) == is_egg):
-                return i
+        fingerprint_index = self.get_fingerprint_index()
+        for weak in [False, True]:
+            # Fingerprints may collide, so make sure it's the right one
+            for i in fingerprint_index[weak].get(self.get_search_key(mon.get_fingerprint(weak=weak), is_egg), []):
+                if mon.is_equal(self.pokemon[i], weak=weak):
+                    return i
         return None
 
     @check_pos_validity
@@ -882,6 +1066,7 @@ class GSCTradingData:
         """
         Procedure which actually evolves the Pokémon in the data.
         """
+        self.invalidate_fingerprints()
         if not self.pokemon[pos].is_nicknamed():
             self.pokemon[pos].add_nickname(self.utils_class.pokemon_names[evolution], 0)
         self.pokemon[pos].set_species(evolution)
@@ -909,6 +1094,7 @@ class GSCTradingData:
         evolution = self.utils_class.get_evolution(self.pokemon[pos].get_species(), self.pokemon[pos].get_item())
         if evolution is None or self.is_mon_egg(pos):
             return None
+        self.invalidate_fingerprints()
         evo_item = self.utils_class.get_evolution_item(self.pokemon[pos].get_species())
         if evo_item is not None:
             self.pokemon[pos].set_item()
@@ -956,6 +1142,8 @@ class GSCTradingData:
         own = self.mon_generator_class().set_data(checks.apply_checks_to_data(checks.single_pokemon_checks_map, self.pokemon[own_index].get_data()))
         
         # Actually trade the Pokémon
+        self.invalidate_fingerprints()
+        other.invalidate_fingerprints()
         self.reorder_party(own_index)
         other.reorder_party(other_index)
         self.pokemon[self.get_last_mon_index()] = other.pokemon[other.get_last_mon_index()]
@@ -970,6 +1158,7 @@ class GSCTradingData:
         """
         Moves a pokémon at the end of the party.
         """
+        self.invalidate_fingerprints()
         pa_info = self.party_info.get_id(traded_pos)
         po_data = self.pokemon[traded_pos]
         for i in range(traded_pos+1,self.get_party_size()):
@@ -1003,6 +1192,17 @@ class GSCTradingData:
         self.utils_class.create_patches_data(data[3], data[3], self.utils_class, is_mail=True)
         return data
     
+class GSCChecksMap(list):
+    """
+    Class which contains the single-byte checks of a section,
+    together with the runs they were compiled into.
+    """
+
+    def __init__(self, functions, runs, is_identity=False):
+        super(GSCChecksMap, self).__init__(functions)
+        self.runs = runs
+        self.is_identity = is_identity
+
 class GSCChecks:
     """
     Class which handles sanity checks and cleaning of the received data.
@@ -1072,9 +1272,13 @@ class GSCChecks:
             self.clean_mail_patch_set,
             self.clean_japanese_mail_patch_set
             ]
+        self.text_table = GSCUtilsLoaders.prepare_translation_table(self.bad_ids_text, self.question_mark)
+        self.items_table = GSCUtilsLoaders.prepare_translation_table(self.bad_ids_items, 0)
+        self.moves_table = GSCUtilsLoaders.prepare_translation_table(self.bad_ids_moves, self.tackle_id)
+        self.run_check_functions = self.get_run_check_functions()
         self.checks_map = self.prepare_checks_map(GSCUtilsMisc.read_data(self.get_path(self.checks_map_path)), section_sizes, self.check_functions)
-        self.single_pokemon_checks_map = GSCUtilsLoaders.prepare_functions_map(GSCUtilsMisc.read_data(self.get_path(self.single_pokemon_checks_map_path)), self.check_functions)
-        self.moves_checks_map = GSCUtilsLoaders.prepare_functions_map(GSCUtilsMisc.read_data(self.get_path(self.moves_checks_map_path)), self.check_functions)
+        self.single_pokemon_checks_map = self.prepare_checker(GSCUtilsMisc.read_data(self.get_path(self.single_pokemon_checks_map_path)), self.check_functions)
+        self.moves_checks_map = self.prepare_checker(GSCUtilsMisc.read_data(self.get_path(self.moves_checks_map_path)), self.check_functions)
         self.species_cleaner = self.clean_species_sp
     
     def get_path(self, target):
@@ -1101,10 +1305,31 @@ class GSCChecks:
                 return True
         return wrapper
     
+    def get_run_check_functions(self):
+        """
+        Returns the checks which don't depend on the previous bytes,
+        mapped to the function which cleans a whole run of them.
+        """
+        return {
+            self.clean_nothing: self.clean_nothing_run,
+            self.clean_text: self.clean_text_run,
+            self.clean_move: self.clean_move_run,
+            self.clean_item: self.clean_item_run,
+            self.clean_egg_cycles_friendship: self.clean_nothing_run,
+            self.clean_type: self.clean_nothing_run
+            }
+    
     def apply_checks_to_data(self, checker, data):
+        if checker.is_identity:
+            return list(data)
         new_data = list(data)
-        for j in range(len(checker)):
-            new_data[j] = checker[j](data[j])
+        for run in checker.runs:
+            start, end, run_check = run
+            if run_check is not None:
+                new_data[start:end] = run_check(data[start:end])
+            else:
+                for j in range(start, end):
+                    new_data[j] = checker[j](data[j])
         return new_data
 
     def prepare_text_buffer(self):
@@ -1133,13 +1358,28 @@ class GSCChecks:
         raw_data_sections = GSCUtilsMisc.divide_data(data, lengths)
         call_map = [[],[],[],[]]
         for i in range(len(raw_data_sections)):
-            call_map[i] = GSCUtilsLoaders.prepare_functions_map(raw_data_sections[i], functions_list)
+            call_map[i] = self.prepare_checker(raw_data_sections[i], functions_list)
         return call_map
     
+    def prepare_checker(self, data, functions_list):
+        """
+        Turns the check ids read from a file into a GSCChecksMap.
+        If the sanity checks are off, every check is the identity.
+        """
+        if not self.do_sanity_checks:
+            return GSCChecksMap([self.skip_check] * len(data), [], is_identity=True)
+        return GSCChecksMap(GSCUtilsLoaders.prepare_functions_map(data, functions_list), GSCUtilsLoaders.prepare_check_runs(data, functions_list, self.run_check_functions))
+    
     @clean_check_sanity_checks
     def clean_nothing(self, val):
         return val
     
+    def skip_check(self, val):
+        return val
+    
+    def clean_nothing_run(self, values):
+        return values
+    
     @clean_check_sanity_checks
     def clean_level(self, level):
         self.level = self.utils_class.get_level_exp(self.curr_species, self.exp, self.utils_class)
@@ -1174,6 +1414,12 @@ class GSCChecks:
         self.item_list += [cleaned_item]
         return cleaned_item
     
+    @clean_check_sanity_checks
+    def clean_item_run(self, items):
+        cleaned_items = list(bytes(items).translate(self.items_table))
+        self.item_list += cleaned_items
+        return cleaned_items
+    
     @clean_check_sanity_checks
     def clean_pp(self, pp):
         current_pp = pp & 0x3F
@@ -1200,6 +1446,16 @@ class GSCChecks:
         self.curr_move += 1
         return final_move
     
+    @clean_check_sanity_checks
+    def clean_move_run(self, moves):
+        final_moves = list(bytes(moves).translate(self.moves_table))
+        for i in range(len(moves)):
+            if moves[i] == GSCChecks.free_value_moves and (self.curr_move + i) > 0:
+                final_moves[i] = GSCChecks.free_value_moves
+        self.moves[self.curr_move:self.curr_move + len(moves)] = final_moves
+        self.curr_move += len(moves)
+        return final_moves
+    
     @clean_check_sanity_checks
     def clean_species(self, species):
         self.curr_species = self.clean_value(species, self.is_species_valid, self.rattata_id)
@@ -1278,6 +1534,13 @@ class GSCChecks:
         # Possibility to put bad words filters here
         return char_val
     
+    @clean_check_sanity_checks
+    def clean_text_run(self, chars):
+        chars_val = list(bytes(chars).translate(self.text_table))
+        self.curr_text += chars_val
+        # Possibility to put bad words filters here
+        return chars_val
+    
     @clean_check_sanity_checks
     def clean_text_final(self, char):
         char_val = self.utils_class.end_of_line
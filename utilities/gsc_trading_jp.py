@@ -1,3 +1,4 @@
+from operator import itemgetter
 from .gsc_trading import GSCTrading
 from .gsc_trading_data_utils import GSCUtilsLoaders, GSCUtilsMisc
 
@@ -12,6 +13,8 @@ class GSCJPMailConverter:
     mail_jp_checks_path = "mail_checks_jp.bin"
     
     end_of_line = 0x50
+    conversion_constants = [0, 0xFF, end_of_line, 0x20]
+    compile_probe_len = 0x10000
     
     extra_distance_jp = 5
     extra_distance_int = 0xA
@@ -63,32 +66,51 @@ class GSCJPMailConverter:
             self.do_eol,
             self.start_sender_conversion
         ]
-        self.mail_conversion_table_jp = GSCUtilsLoaders.prepare_functions_map(GSCUtilsMisc.read_data(self.get_path(self.table_to_jp_path)), self.conversion_functions)
-        self.mail_conversion_table_int = GSCUtilsLoaders.prepare_functions_map(GSCUtilsMisc.read_data(self.get_path(self.table_to_int_path)), self.conversion_functions)
-        self.mail_checker = GSCUtilsLoaders.prepare_functions_map(GSCUtilsMisc.read_data(self.get_path(self.mail_jp_checks_path)), checks.check_functions)
+        self.mail_conversion_table_jp = self.compile_converter(GSCUtilsMisc.read_data(self.get_path(self.table_to_jp_path)), self.mail_pos_int, self.sender_pos_int, self.extra_distance_int)
+        self.mail_conversion_table_int = self.compile_converter(GSCUtilsMisc.read_data(self.get_path(self.table_to_int_path)), self.mail_pos_jp, self.sender_pos_jp, self.extra_distance_jp)
+        self.mail_checker = checks.prepare_checker(GSCUtilsMisc.read_data(self.get_path(self.mail_jp_checks_path)), checks.check_functions)
         
     def get_path(self, target):
         return self.base_folder + target
         
-    def convert_to_jp(self, data):
-        self.mail_converter_pos = self.mail_pos_int
-        self.sender_converter_pos = self.sender_pos_int
-        self.extra_distance = self.extra_distance_int
-        return self.convert(data, self.mail_conversion_table_jp)
+    def compile_converter(self, table_data, mail_converter_pos, sender_converter_pos, extra_distance):
+        """
+        Runs the conversion functions once to find where each byte
+        comes from. Returns a gatherer of those bytes.
+        Constants are taken from the start of the source.
+        """
+        self.mail_converter_pos = mail_converter_pos
+        self.sender_converter_pos = sender_converter_pos
+        self.extra_distance = extra_distance
+        converter = GSCUtilsLoaders.prepare_functions_map(table_data, self.conversion_functions)
         
-    def convert_to_int(self, data):
-        self.mail_converter_pos = self.mail_pos_jp
-        self.sender_converter_pos = self.sender_pos_jp
-        self.extra_distance = self.extra_distance_jp
-        return self.convert(data, self.mail_conversion_table_int)
+        # Constants don't change when the source does
+        first_probe = self.run_converter(range(self.compile_probe_len), converter)
+        second_probe = self.run_converter(range(1, self.compile_probe_len + 1), converter)
+        indexes = [0] * len(converter)
+        for i in range(len(converter)):
+            if first_probe[i] != second_probe[i]:
+                indexes[i] = first_probe[i] + len(self.conversion_constants)
+            else:
+                indexes[i] = self.conversion_constants.index(first_probe[i])
+        return itemgetter(*indexes)
         
-    def convert(self, to_convert, converter):
+    def run_converter(self, to_convert, converter):
         self.mail_conv_pos = -1
         self.sender_conv_pos = -1
         ret = [0] * len(converter)
         for i in range(len(converter)):
             ret[i] = converter[i](to_convert)
         return ret
+        
+    def convert_to_jp(self, data):
+        return self.convert(data, self.mail_conversion_table_jp)
+        
+    def convert_to_int(self, data):
+        return self.convert(data, self.mail_conversion_table_int)
+        
+    def convert(self, to_convert, converter):
+        return list(converter(self.conversion_constants + list(to_convert)))
     
     def do_zero(self, data):
         return 0
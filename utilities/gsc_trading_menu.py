@@ -1,4 +1,5 @@
 import threading
+import time
 from random import Random
 from .trading_version import TradingVersion
 from .gsc_trading_strings import GSCTradingStrings
@@ -34,6 +35,10 @@ class GSCTradingMenu:
         self.gen = args.gen_number
         self.trade_type = args.trade_type
         self.room = args.room
+        self.metrics_port = args.metrics_port
+        self.metrics_file = args.metrics_file
+        self.timeline_file = args.timeline_file
+        self.profile_file = args.profile_file
         self.toppest_menu_handlers = {
             "1": self.start_gen1_trading,
             "2": self.start_gen2_trading,
@@ -237,6 +242,14 @@ class GSCTradingMenu:
         parser.add_argument("-q", "--quiet",
                             action="store_false", dest="verbose", default=True,
                             help="don't print status messages to stdout")
+        parser.add_argument("-mtp", "--metrics_port", dest="metrics_port", default = None,
+                            help="local port which exposes the session's metrics", type=int)
+        parser.add_argument("-mtf", "--metrics_file", dest="metrics_file", default = None,
+                            help="file the session's metrics are periodically written to")
+        parser.add_argument("-tlf", "--timeline_file", dest="timeline_file", default = None,
+                            help="JSONL file the session's phases are logged to")
+        parser.add_argument("-pff", "--profile_file", dest="profile_file", default = None,
+                            help="file the session's sampled stacks are written to, for flame graphs")
         parser.add_argument("-sh", "--server_host", dest="server_host", default = self.default_server[0],
                             help="server's host")
         parser.add_argument("-sp", "--server_port", dest="server_port", default = self.default_server[1],
@@ -301,3 +314,92 @@ class GSCBufferedNegotiator(threading.Thread):
         self.final_buffered = self.choose_if_buffered()
         if self.menu.verbose:
             GSCTradingStrings.chosen_buffered_print(self.final_buffered)
+
+class GSCPoolPrefetcher(threading.Thread):
+    """
+    Class used to get the Pool's trade offer in the background,
+    while the device is busy with something else.
+    Until it's done or stopped, this thread is the only user of comms
+    and of the trader's checks: meanwhile the main thread only talks
+    with the device, and it reads the offer through get_prefetched
+    """
+
+    def __init__(self, comms, sleep_func):
+        threading.Thread.__init__(self)
+        self.daemon=True
+        self.comms = comms
+        self.prefetched = None
+        self.sleep_func = sleep_func
+        self.running = True
+    
+    def get_prefetched(self):
+        return self.prefetched
+
+    def stop(self):
+        """
+        Stops fetching, and waits until comms is free again.
+        """
+        self.running = False
+        self.join()
+
+    def run(self):
+        received = None
+        while (received is None) and self.running:
+            self.sleep_func()
+            received = self.comms.get_pool_trading_data()
+        self.prefetched = received
+
+class GSCProgressRenderer(threading.Thread):
+    """
+    Class used to print the progress of the transfers at a limited rate.
+    The transfer loops only update the counters.
+    The thread starts with the first update, and ends with stop().
+    """
+    refresh_time = 0.1
+
+    def __init__(self, verbose):
+        threading.Thread.__init__(self)
+        self.daemon=True
+        self.verbose = verbose
+        self.lock = threading.Lock()
+        self.progress = None
+        self.printed = None
+        self.started = False
+        self.running = True
+    
+    def update(self, index, done, total):
+        self.progress = (index, done, total)
+        if not self.started:
+            self.started = True
+            self.start()
+    
+    def stop(self):
+        """
+        Stops the thread, if it was started, and waits for it.
+        """
+        self.running = False
+        if self.started:
+            self.join()
+    
+    def finish(self, index, total):
+        """
+        Prints the completed section right away.
+        """
+        with self.lock:
+            self.progress = (index, total, total)
+            self.repaint()
+            self.progress = None
+            self.printed = None
+    
+    def repaint(self):
+        progress = self.progress
+        if (progress is not None) and (progress != self.printed):
+            self.printed = progress
+            if self.verbose:
+                print(GSCTradingStrings.transfer_to_hardware_str.format(index=progress[0], completion=GSCTradingStrings.x_out_of_y_str(progress[1], progress[2])), end='', flush=True)
+
+    def run(self):
+        while self.running:
+            time.sleep(self.refresh_time)
+            with self.lock:
+                self.repaint()
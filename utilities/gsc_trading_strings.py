@@ -19,6 +19,7 @@ class GSCTradingStrings:
     active_kill_on_byte_drops_str = "Disable Crash on synchronous byte drop (Current: Enabled)"
     inactive_kill_on_byte_drops_str = "Enable Crash on synchronous byte drop (Current: Disabled)"
     websocket_client_error_str = 'Websocket client error:'
+    websocket_rtt_error_str = 'Round trip measurements stopped:'
     connection_dropped_str = 'Connection dropped'
     p2p_listening_str = 'Listening on {host}:{port}...'
     p2p_server_str = 'Received connection from {host}:{port}'
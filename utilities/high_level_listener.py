@@ -1,5 +1,7 @@
+import zlib
 from time import sleep
 from .gsc_trading_strings import GSCTradingStrings
+from .trading_metrics import TradingMetrics
 
 class HighLevelListener:
     """
@@ -9,6 +11,9 @@ class HighLevelListener:
     REQ_INFO_POSITION = 0
     LEN_POSITION = 5
     DATA_POSITION = LEN_POSITION + 2
+    COMPRESSED_FLAG = 0x8000
+    COMPRESSION_THRESHOLD = 0x80
+    COMPRESSION_LEVEL = 1
     
     def __init__(self):
         self.to_send = None
@@ -16,9 +21,46 @@ class HighLevelListener:
         self.recv_dict = {}
         self.send_dict = {}
         self.valid_transfers = None
+        self.max_transfer_lens = None
+        self.transfer_bounds = None
+        self.compression_enabled = False
+        self.compressible_transfers = set()
+
+    def set_compressible_transfers(self, compressible_transfers):
+        """
+        Only transfers between the two clients can be compressed,
+        never the ones the server reads itself.
+        """
+        self.compressible_transfers = compressible_transfers
+
+    def enable_compression(self):
+        """
+        The other side can decompress data, so big payloads
+        will be sent compressed.
+        """
+        self.compression_enabled = True
 
     def prepare_send_data(self, type, data):
-        return bytearray(list((GSCTradingStrings.send_request + type).encode()) + [(len(data) >> 8) & 0xFF, len(data) & 0xFF] + data)
+        data_len = len(data)
+        if self.compression_enabled and (type in self.compressible_transfers) and (len(data) >= HighLevelListener.COMPRESSION_THRESHOLD):
+            compressed = list(zlib.compress(bytes(data), HighLevelListener.COMPRESSION_LEVEL))
+            if len(compressed) < len(data):
+                data = compressed
+                data_len = len(compressed) | HighLevelListener.COMPRESSED_FLAG
+        return bytearray(list((GSCTradingStrings.send_request + type).encode()) + [(data_len >> 8) & 0xFF, data_len & 0xFF] + data)
+    
+    def decompress_data(self, data, max_len):
+        """
+        Returns None if the data is broken or bigger than max_len.
+        """
+        decompressor = zlib.decompressobj()
+        try:
+            ret = decompressor.decompress(bytes(data), max_len + 1)
+        except zlib.error:
+            return None
+        if (not decompressor.eof) or (len(ret) > max_len):
+            return None
+        return list(ret)
     
     def prepare_get_data(self, type):
         return bytearray(list((GSCTradingStrings.get_request + type).encode()))
@@ -34,7 +76,26 @@ class HighLevelListener:
         self.reset_dict(type, self.send_dict)
     
     def set_valid_transfers(self, valid_transfers):
+        """
+        Each transfer has either a set of valid lengths,
+        or a range of them, which is checked by its bounds.
+        """
         self.valid_transfers = valid_transfers
+        self.max_transfer_lens = {}
+        self.transfer_bounds = {}
+        for req_type in valid_transfers.keys():
+            lengths = valid_transfers[req_type]
+            if isinstance(lengths, range):
+                self.transfer_bounds[req_type] = (lengths.start, lengths.stop - 1)
+                self.max_transfer_lens[req_type] = lengths.stop - 1
+            else:
+                self.max_transfer_lens[req_type] = max(lengths)
+    
+    def is_length_valid(self, req_type, length):
+        if req_type in self.transfer_bounds:
+            min_len, max_len = self.transfer_bounds[req_type]
+            return min_len <= length <= max_len
+        return length in self.valid_transfers[req_type]
     
     def send_data(self, type, data):
         """
@@ -46,6 +107,19 @@ class HighLevelListener:
         while self.to_send is not None:
             sleep(HighLevelListener.SLEEP_TIMER)
     
+    def store_data(self, type, data):
+        """
+        Prepares the dict's entry for responding to GETs,
+        without sending the data.
+        """
+        self.send_dict[type] = data
+    
+    def store_received_data(self, type, data):
+        """
+        Stores data as if it had been received.
+        """
+        self.recv_dict[type] = data
+    
     def prepare_listener(self, type, listener):
         """
         Function called when a certain type of data is received.
@@ -57,6 +131,8 @@ class HighLevelListener:
         Checks if the data has been received. If not, it issues a GET.
         """
         if not type in self.recv_dict.keys():
+            if TradingMetrics.enabled:
+                TradingMetrics.get_requests.inc()
             self.to_send = self.prepare_get_data(type)
             while self.to_send is not None:
                 sleep(HighLevelListener.SLEEP_TIMER)
@@ -90,9 +166,20 @@ class HighLevelListener:
             # If it's a send request, is it long enough to have the data length field?
             if (req_kind == GSCTradingStrings.send_request) and (self.valid_transfers is not None) and (len(data) > HighLevelListener.DATA_POSITION):
                 data_len = (data[HighLevelListener.LEN_POSITION] << 8) + data[HighLevelListener.LEN_POSITION+1]
-                # If it has a length, is it a valid request? Is its length right? Is the advertised length real?
-                if (len(data) >= (HighLevelListener.DATA_POSITION + data_len)) and (req_type in self.valid_transfers.keys()) and (data_len in self.valid_transfers[req_type]):
-                    return [req_kind, req_type, data_len]
+                is_compressed = (data_len & HighLevelListener.COMPRESSED_FLAG) != 0
+                data_len &= ~HighLevelListener.COMPRESSED_FLAG
+                # If it has a length, is it a valid request? Is the advertised length real?
+                if (len(data) >= (HighLevelListener.DATA_POSITION + data_len)) and (req_type in self.valid_transfers.keys()):
+                    payload = list(data[HighLevelListener.DATA_POSITION:HighLevelListener.DATA_POSITION+data_len])
+                    if is_compressed:
+                        # The server reads some transfers itself, those are never compressed
+                        if req_type in self.compressible_transfers:
+                            payload = self.decompress_data(payload, self.max_transfer_lens[req_type])
+                        else:
+                            payload = None
+                    # Is its length right, once decompressed?
+                    if (payload is not None) and self.is_length_valid(req_type, len(payload)):
+                        return [req_kind, req_type, len(payload), payload]
             elif req_kind == GSCTradingStrings.get_request:
                 return [req_kind, req_type]
         return None
@@ -104,16 +191,19 @@ class HighLevelListener:
         If it's a get, it sends the requested data, if present
         inside the send dict.
         """
+        if TradingMetrics.enabled:
+            TradingMetrics.received_messages.inc()
         ret = self.is_received_valid(data)
         if ret is None:
+            if TradingMetrics.enabled:
+                TradingMetrics.invalid_messages.inc()
             return ["", "", None]
             
         req_kind = ret[0]
         req_type = ret[1]
         prepared = None
         if req_kind == GSCTradingStrings.send_request:
-            data_len = ret[2]
-            self.recv_dict[req_type] = list(data[HighLevelListener.DATA_POSITION:HighLevelListener.DATA_POSITION+data_len])
+            self.recv_dict[req_type] = ret[3]
             if req_type in self.on_receive_dict.keys():
                 self.on_receive_dict[req_type]()
         elif req_kind == GSCTradingStrings.get_request:
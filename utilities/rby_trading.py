@@ -1,6 +1,7 @@
 from .gsc_trading import GSCTradingClient, GSCTrading
 from .gsc_trading_strings import GSCTradingStrings
 from .rby_trading_data_utils import RBYUtils, RBYTradingData, RBYChecks
+from .trading_timeline import TradingTimeline
 
 class RBYTradingClient(GSCTradingClient):
     """
@@ -10,6 +11,8 @@ class RBYTradingClient(GSCTradingClient):
     """
     base_folder = "useful_data/rby/"
     full_transfer = "FLL1"
+    full_delta_transfer = "FLD1"
+    full_ack_transfer = "FLA1"
     single_transfer = "SNG1"
     pool_transfer = "POL1"
     moves_transfer = "MVS1"
@@ -20,10 +23,13 @@ class RBYTradingClient(GSCTradingClient):
     negotiation_transfer = "NEG1"
     version_client_transfer = "VEC1"
     version_server_transfer = "VES1"
+    capabilities_transfer = "CAP1"
     random_data_transfer = "RAN1"
     need_data_transfer = "ASK1"
     possible_transfers = {
         full_transfer: {0x271}, # Sum of special_sections_len
+        full_delta_transfer: range(GSCTradingClient.delta_hash_len, 0x271), # Hash of the base + Patches, smaller than full_transfer
+        full_ack_transfer: {GSCTradingClient.delta_hash_len}, # Hash of the received full_transfer
         single_transfer: {7, 32},
         pool_transfer: {1 + 0x42, 1 + 1}, # Counter + Single Pokémon OR Counter + Fail
         moves_transfer: {1 + 1 + 8}, # Counter + Species + Moves
@@ -34,9 +40,11 @@ class RBYTradingClient(GSCTradingClient):
         negotiation_transfer : {1 + 1}, # Counter + Convergence value
         version_client_transfer : {6}, # Client's version value
         version_server_transfer : {6}, # Server's version value
+        capabilities_transfer : {2}, # Client's capability flags - Ver 4.1
         random_data_transfer : {10}, # Random values from server
         need_data_transfer : {1 + 1} # Counter + Whether it needs the other player's data
     }
+    compressible_transfers = {full_transfer, full_delta_transfer} # Only sent between the two clients
     
     def __init__(self, trader, connection, verbose, stop_trade, party_reader, base_no_trade = base_folder + "base.bin", base_pool = base_folder + "base_pool.bin"):
         super(RBYTradingClient, self).__init__(trader, connection, verbose, stop_trade, party_reader, base_no_trade=base_no_trade, base_pool=base_pool)
@@ -58,6 +66,7 @@ class RBYTradingClient(GSCTradingClient):
             for i in range(4):
                 updating_mon.set_move(i, data[i+1], max_pp=False)
                 updating_mon.set_pp(i, data[i+5])
+            self.trader.other_pokemon.invalidate_fingerprints()
             if data[0] != updating_mon.get_species():
                 self.trader.other_pokemon.evolution_procedure(self.trader.other_pokemon.get_last_mon_index(), data[0])
         return val
@@ -137,6 +146,7 @@ class RBYTrading(GSCTrading):
         send_data[0] = self.utils_class.base_random_section
         just_sent = None
         self.is_running_compat_3_mode = True
+        TradingTimeline.begin("version_exchange")
         self.comms.send_client_version()
         server_version = self.attempt_receive(self.comms.get_server_version, 5)
         if server_version is not None:
@@ -144,6 +154,7 @@ class RBYTrading(GSCTrading):
             other_client_version = self.attempt_receive(self.comms.get_client_version, 5)
             if other_client_version is not None:
                 self.is_running_compat_3_mode = False
+        TradingTimeline.end()
         if self.is_running_compat_3_mode:
             random_data, random_data_other, just_sent = self.read_section(0, send_data[0], buffered, just_sent, 0)
         else:
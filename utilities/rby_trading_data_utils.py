@@ -192,18 +192,8 @@ class RBYTradingData(GSCTradingData):
     def get_utils_class(self):
         return RBYUtils
     
-    def search_for_mon(self, mon, is_egg):
-        """
-        Returns None if a provided pokémon is not in the party.
-        Otherwise, it returns their index.
-        """
-        for i in range(self.get_party_size()):
-            if mon.is_equal(self.pokemon[i]):
-                return i
-        for i in range(self.get_party_size()):
-            if mon.is_equal(self.pokemon[i], weak=True):
-                return i
-        return None
+    def get_search_key(self, fingerprint, is_egg):
+        return fingerprint
 
     @GSCTradingData.check_pos_validity
     def is_mon_egg(self, pos):
@@ -269,6 +259,13 @@ class RBYChecks(GSCChecks):
     def get_utils_class(self):
         return RBYUtils
     
+    def get_run_check_functions(self):
+        run_functions = super(RBYChecks, self).get_run_check_functions()
+        # Items are not checked, and types depend on the species
+        run_functions[self.clean_item] = self.clean_nothing_run
+        run_functions.pop(self.clean_type)
+        return run_functions
+    
     @GSCChecks.clean_check_sanity_checks
     def clean_species(self, species):
         self.type_pos = 0
@@ -1,8 +1,10 @@
 import time
 from .gsc_trading import GSCTradingClient, GSCTrading
 from .gsc_trading_strings import GSCTradingStrings
-from .rse_sp_trading_data_utils import RSESPUtils, RSESPTradingData, RSESPChecks
+from .rse_sp_trading_data_utils import RSESPUtils, RSESPTradingData, RSESPChecks, RSESPChecksumTracker
 from .gsc_trading_data_utils import GSCUtilsMisc
+from .trading_metrics import TradingMetrics
+from .trading_timeline import TradingTimeline
 
 class RSESPTradingClient(GSCTradingClient):
     """
@@ -12,6 +14,8 @@ class RSESPTradingClient(GSCTradingClient):
     """
     base_folder = "useful_data/rse/"
     full_transfer = "FL3S"
+    full_delta_transfer = "FD3S"
+    full_ack_transfer = "FA3S"
     pool_transfer = "P3SI"
     pool_transfer_out = "P3SO"
     choice_transfer = "CH3S"
@@ -21,6 +25,8 @@ class RSESPTradingClient(GSCTradingClient):
     success_transfer = ["S3S1", "S3S2", "S3S3", "S3S4", "S3S5", "S3S6", "S3S7"]
     possible_transfers = {
         full_transfer: {0x380}, # Total transfer's length - v1.0.0 
+        full_delta_transfer: range(GSCTradingClient.delta_hash_len, 0x380), # Hash of the base + Patches, smaller than full_transfer
+        full_ack_transfer: {GSCTradingClient.delta_hash_len}, # Hash of the received full_transfer
         pool_transfer: {1 + 0x95, 1 + 1}, # Counter + Single Pokémon (and mail + version + special ribbons) OR Counter + Fail
         pool_transfer_out: {1 + 0x95, 1}, # Counter + Single Pokémon (and mail + version + special ribbons)
         choice_transfer : {1 + 3}, # Counter + Choice
@@ -36,6 +42,7 @@ class RSESPTradingClient(GSCTradingClient):
         version_client_transfer : {6}, # Client's version value
         version_server_transfer : {6}, # Server's version value
     }
+    compressible_transfers = {full_transfer, full_delta_transfer} # Only sent between the two clients
     
     def __init__(self, trader, connection, verbose, stop_trade, party_reader, base_no_trade = base_folder + "base.bin", base_pool = base_folder + "base_pool.bin"):
         super(RSESPTradingClient, self).__init__(trader, connection, verbose, stop_trade, party_reader, base_no_trade=base_no_trade, base_pool=base_pool)
@@ -102,7 +109,10 @@ class RSESPTradingClient(GSCTradingClient):
         the player's entire trading data and prepares the data for 
         closing that trade.
         """
-        return self.connection.recv_data(self.full_transfer)
+        data = self.connection.recv_data(self.full_transfer)
+        if data is not None:
+            self.ack_big_trading_data(data)
+        return data
 
     def get_accepted(self, num_accept):
         """
@@ -159,6 +169,8 @@ class RSESPTrading(GSCTrading):
     sending_data_control_flag = 0x10
     in_party_trading_flag = 0x80
     since_last_useful_limit = 10
+    since_last_useful_min = 4
+    since_last_useful_max = 40
     base_send_data_start = 1
     base_data_chunk_size = 0xFE
     accept_trade = [0xA2, 0xB2]
@@ -170,6 +182,7 @@ class RSESPTrading(GSCTrading):
     
     def __init__(self, sending_func, receiving_func, connection, menu, kill_function, pre_sleep):
         super(RSESPTrading, self).__init__(sending_func, receiving_func, connection, menu, kill_function, pre_sleep)
+        self.init_reask_limit()
         
     def get_and_init_utils_class(self):
         RSESPUtils()
@@ -287,51 +300,106 @@ class RSESPTrading(GSCTrading):
         
         return next
 
-    def find_uncompleted_range(self, completed_data):
-        i = 0
-        max_size = 0
-        max_start = 0
-        max_end = 0
-        while i < len(completed_data):
-            k = i
-            for l in range(i, len(completed_data)):
-                if completed_data[l]:
-                    break
-                k += 1
-            if(k - i) > max_size:
-                max_size = k - i
-                max_start = i
-                max_end = k
-            if k != i:
-                i = k
+    def init_reask_limit(self):
+        self.useful_gap_avg = 1
+        self.useful_gap_var = (self.since_last_useful_limit - self.useful_gap_avg) / 4
+        self.ask_latency = 1
+        self.reask_limit = self.since_last_useful_limit
+    
+    def set_reask_limit(self, limit):
+        self.reask_limit = min(max(int(limit), self.since_last_useful_min), self.since_last_useful_max)
+    
+    def update_reask_limit(self, gap, is_after_ask):
+        """
+        Adapts how many useless swaps are waited before asking again
+        to the observed distance between useful ones.
+        The first answer to an ask also tells how slow asking is.
+        """
+        if is_after_ask:
+            self.ask_latency += (gap - self.ask_latency) / 4
+        else:
+            self.useful_gap_var += (abs(gap - self.useful_gap_avg) - self.useful_gap_var) / 4
+            self.useful_gap_avg += (gap - self.useful_gap_avg) / 8
+        self.set_reask_limit(max(self.useful_gap_avg + (4 * self.useful_gap_var), self.ask_latency + 2))
+    
+    def backoff_reask_limit(self):
+        """
+        Nothing useful came after the last ask. Wait a bit longer,
+        in case the answer is just slow.
+        """
+        self.set_reask_limit(self.reask_limit + max(1, self.reask_limit >> 2))
+    
+    def find_uncompleted_ranges(self, missing, merge_distance=0):
+        """
+        Returns the ranges of the missing chunks, largest first.
+        missing has a bit set for each chunk which is yet to arrive.
+        Ranges up to merge_distance chunks apart are joined.
+        """
+        ranges = []
+        while missing != 0:
+            start = (missing & -missing).bit_length() - 1
+            shifted = missing >> start
+            size = (shifted ^ (shifted + 1)).bit_length() - 1
+            if (len(ranges) > 0) and ((start - ranges[-1][1]) <= merge_distance):
+                ranges[-1] = (ranges[-1][0], start + size)
             else:
-                i += 1
-        return max_start, max_end
+                ranges += [(start, start + size)]
+            missing &= ~(((1 << size) - 1) << start)
+        # Stable sort, so equally big ranges stay in order
+        ranges.sort(key=lambda curr_range: curr_range[0] - curr_range[1])
+        return ranges
+    
+    def get_next_hole(self, missing, pending_ranges):
+        """
+        Pops the next range which still has missing chunks,
+        shrunk to the chunks which are actually missing.
+        """
+        while len(pending_ranges) > 0:
+            start, end = pending_ranges.pop(0)
+            hole = missing & (((1 << (end - start)) - 1) << start)
+            if hole != 0:
+                return (hole & -hole).bit_length() - 1, hole.bit_length(), hole
+        return 0, 0, 0
                     
     def read_section(self, send_data):
         """
         Reads a data section and sends it to the device.
         """
+        start_time = time.monotonic()
+        TradingTimeline.begin("read_section", section=0)
         length = self.special_sections_len[0]
-        completed_data = []
-        buf = []
-        for i in range(int(length/2)):
-            completed_data += [False]
-            buf += [0, 0]
+        buf = [0] * (int(length/2) * 2)
+        all_missing = (1 << int(length/2)) - 1
+        missing = all_missing
+        pending_ranges = []
+        asked_hole = 0
+        start = 0
+        end = 0
+        checksum_tracker = RSESPChecksumTracker(RSESPTradingData, buf, self.special_sections_len)
         
         num_uncompleted = int(length/2)
         other_pos_gen3 = 0
         other_end_gen3 = 0
         
         next = 0
-        since_last_useful = self.since_last_useful_limit
+        since_last_useful = self.reask_limit
+        useful_since_ask = True
         transfer_successful = False
         has_all_data = False
         #self.sync_with_cable(self.not_done_control_flag|self.asking_data_nybble)
         
         while not transfer_successful:
-            if (since_last_useful >= self.since_last_useful_limit) and not has_all_data:
-                start, end = self.find_uncompleted_range(completed_data)
+            if (since_last_useful >= self.reask_limit) and not has_all_data:
+                # Go through the holes in order, largest first,
+                # instead of always asking for the biggest one
+                # Getting chunks again is cheaper than waiting for
+                # another ask, if they are close enough
+                if len(pending_ranges) == 0:
+                    pending_ranges = self.find_uncompleted_ranges(missing, merge_distance=int(self.ask_latency))
+                start, end, asked_hole = self.get_next_hole(missing, pending_ranges)
+                if not useful_since_ask:
+                    self.backoff_reask_limit()
+                useful_since_ask = False
                 next, index, is_valid, is_asking, is_complete, is_done, tmp_other_pos_gen3, tmp_other_end_gen3 = self.ask_trade_setup_data(start, end)
                 since_last_useful = 0
             else:
@@ -354,29 +422,44 @@ class RSESPTrading(GSCTrading):
                 other_end_gen3 = tmp_other_end_gen3
             elif not (is_done and is_complete):
                 if (not has_all_data) and is_valid:
-                    buf[index*2] = next & 0xFF
-                    buf[(index*2)+1] = (next>>8) & 0xFF
-                    if not completed_data[index]:
+                    checksum_tracker.update(buf, index, next)
+                    if (missing >> index) & 1:
+                        self.update_reask_limit(since_last_useful, not useful_since_ask)
+                        useful_since_ask = True
                         since_last_useful = 0
-                        completed_data[index] = True
+                        missing &= ~(1 << index)
                         num_uncompleted -= 1
                         if num_uncompleted == 0:
-                            if RSESPTradingData.are_checksum_valid(RSESPTradingData, buf, self.special_sections_len):
+                            if checksum_tracker.are_checksum_valid(buf):
                                 has_all_data = True
                                 if send_data is None:
                                     transfer_successful = True
                             else:
-                                for i in range(int(length/2)):
-                                    completed_data[i] = False
-                                since_last_useful = self.since_last_useful_limit
-                                num_uncompleted = int(length/2)
+                                # Only get again what the failed checksums cover
+                                missing = checksum_tracker.get_failed_chunks(buf)
+                                if missing == 0:
+                                    missing = all_missing
+                                pending_ranges = []
+                                asked_hole = 0
+                                since_last_useful = self.reask_limit
+                                num_uncompleted = bin(missing).count("1")
+                    # The asked range was sent past its last missing chunk,
+                    # so what is still missing must be asked for again
+                    if (asked_hole != 0) and (start <= index < end) and (((missing & asked_hole) >> index) == 0):
+                        asked_hole = 0
+                        since_last_useful = self.reask_limit
             else:
                 if has_all_data:
                     transfer_successful = True
-            self.verbose_print(GSCTradingStrings.transfer_to_hardware_str.format(index=0, completion=GSCTradingStrings.x_out_of_y_str(length-(num_uncompleted*2), length)), end='')
+            self.progress.update(0, length-(num_uncompleted*2), length)
 
+        self.progress.finish(0, length)
         other_buf = send_data
         self.verbose_print(GSCTradingStrings.separate_section_str, end='')
+        if TradingMetrics.enabled:
+            TradingMetrics.sections.inc()
+            TradingMetrics.section_time.observe(time.monotonic() - start_time)
+        TradingTimeline.end()
         return buf, other_buf
                 
     def wait_for_set_of_values(self, next, values):
@@ -454,11 +537,13 @@ class RSESPTrading(GSCTrading):
         """
         Forces a currently open trade menu to be closed.
         """
+        TradingTimeline.begin("end_trade")
         next = 0
         while(next is None or ((next & 0xFF0000) != self.stop_trade)):
             next = self.swap_trade_offer_data_pure(0, is_cancel=True)
 
         self.send_data_multiple_times(self.swap_trade_offer_data_pure, self.stop_trade)
+        TradingTimeline.end()
 
     def do_trade(self, get_mon_function, close=False, to_server=False):
         """
@@ -475,6 +560,7 @@ class RSESPTrading(GSCTrading):
 
         while not trade_completed:
             # Get the choice
+            TradingTimeline.begin("choice")
             sent_mon = self.wait_for_choice(0)
 
             if not close:
@@ -499,6 +585,7 @@ class RSESPTrading(GSCTrading):
 
             if not self.is_choice_stop(received_choice) and not self.is_choice_stop(sent_mon):
                 # Send the other player's choice to the game
+                TradingTimeline.begin("accept")
                 self.send_data_multiple_times(self.swap_trade_offer_data_pure, received_choice)
                 
                 for i in range(2):
@@ -523,6 +610,7 @@ class RSESPTrading(GSCTrading):
 
                 if not self.is_choice_decline(received_accepted, 1) and not self.is_choice_decline(accepted, 1):
 
+                    TradingTimeline.begin("success")
                     for i in range(7):
                         # Conclude the trade successfully
                         success_result = self.wait_for_success(0, i)
@@ -535,6 +623,11 @@ class RSESPTrading(GSCTrading):
                         self.send_data_multiple_times(self.swap_trade_raw_data_pure, received_success)
 
                     trade_completed = True
+                    TradingTimeline.end()
+                    if not (self.has_failed(success_result) or self.has_failed(received_success)):
+                        if TradingMetrics.enabled:
+                            TradingMetrics.trades.inc()
+                        TradingTimeline.next_trade()
                     self.verbose_print(GSCTradingStrings.restart_trade_str)
                     self.exit_or_new = True
                     self.comms.reset_big_trading_data()
@@ -557,6 +650,7 @@ class RSESPTrading(GSCTrading):
                     
                     # Send the other player's choice to the game
                     self.send_data_multiple_times(self.swap_trade_offer_data_pure, received_choice)
+        TradingTimeline.end()
         self.reset_trade()
         return False
     
@@ -566,10 +660,12 @@ class RSESPTrading(GSCTrading):
         It also keeps the device clock running properly.
         """
         received = None
+        wait = TradingTimeline.start_peer_wait()
         while received is None:
             self.sleep_func()
             received = fun()
             self.swap_byte(0)
+        TradingTimeline.end_peer_wait(wait)
         return received
     
     def force_receive_multi(self, fun, num):
@@ -578,10 +674,12 @@ class RSESPTrading(GSCTrading):
         It also keeps the device clock running properly.
         """
         received = None
+        wait = TradingTimeline.start_peer_wait()
         while received is None:
             self.sleep_func()
             received = fun(num)
             self.swap_byte(0)
+        TradingTimeline.end_peer_wait(wait)
         return received
         
     def trade_starting_sequence(self, buffered, send_data = [None, None, None, None]):
@@ -625,6 +723,7 @@ class RSESPTrading(GSCTrading):
 
             # Start interacting with the trading menu
             if self.do_trade(self.comms.get_chosen_mon, close=not valid):
+                self.progress.stop()
                 break
 
     def pool_trade(self):
@@ -645,6 +744,7 @@ class RSESPTrading(GSCTrading):
 
             # Start interacting with the trading menu
             if self.do_trade(self.get_first_mon, to_server=True):
+                self.progress.stop()
                 break
         
     # Function needed in order to make sure there is enough time for the slave to prepare the next byte.
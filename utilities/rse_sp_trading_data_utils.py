@@ -1,4 +1,5 @@
 import math
+import struct
 from .gsc_trading_data_utils import GSCUtils, GSCTradingText, GSCTradingPokémonInfo, GSCTradingPartyInfo, GSCTradingData, GSCChecks, GSCUtilsMisc
 
 class RSESPUtils(GSCUtils):
@@ -14,7 +15,17 @@ class RSESPUtils(GSCUtils):
     invalid_held_items = None
     invalid_pokemon = None
     abilities = None
+    nature_boosts = None
+    enc_positions = None
+    enc_offsets = None
+    enc_orders = None
+    num_substructures = 4
+    substructure_len = 12
+    enc_block_len = num_substructures * substructure_len
+    enc_key_spread = sum([1 << (32 * i) for i in range(enc_block_len >> 2)])
+    enc_checksum_format = "<" + str(enc_block_len >> 1) + "H"
     num_entries = 0x1BD
+    num_natures = 25
     last_valid_pokemon = 411
     last_valid_item = 376
     last_valid_move = 354
@@ -24,6 +35,7 @@ class RSESPUtils(GSCUtils):
         super(RSESPUtils, self).__init__()
         curr_class = type(self)
         curr_class.init_enc_positions(curr_class)
+        curr_class.init_nature_boosts(curr_class)
         curr_class.invalid_held_items = GSCUtilsMisc.read_data(self.get_path(curr_class.invalid_held_items_path))
         curr_class.invalid_pokemon = GSCUtilsMisc.read_data(self.get_path(curr_class.invalid_pokemon_path))
         curr_class.abilities = GSCUtilsMisc.read_data(self.get_path(curr_class.abilities_path))
@@ -38,6 +50,77 @@ class RSESPUtils(GSCUtils):
                             for l in range(4):
                                 if((l != i) and (l != j) and (l != k)):
                                     curr_class.enc_positions += [(0<<(i*2)) | (1<<(j*2)) | (2<<(k*2)) | (3<<(l*2))]
+        # Offset of each substructure inside the block, and
+        # which substructure goes in each slot of the block
+        curr_class.enc_offsets = []
+        curr_class.enc_orders = []
+        for position in curr_class.enc_positions:
+            slots = [(position>>(2*i))&3 for i in range(curr_class.num_substructures)]
+            curr_class.enc_offsets += [tuple([slot * curr_class.substructure_len for slot in slots])]
+            curr_class.enc_orders += [tuple([slots.index(i) for i in range(curr_class.num_substructures)])]
+    
+    def init_nature_boosts(curr_class):
+        curr_class.nature_boosts = []
+        for nature in range(curr_class.num_natures):
+            stat_boosted = int(nature / 5) + 1
+            stat_nerfed = (nature  % 5) + 1
+            boosts = [1.0] * curr_class.num_stats
+            if stat_boosted != stat_nerfed:
+                boosts[stat_boosted] = 1.1
+                boosts[stat_nerfed] = 0.9
+            curr_class.nature_boosts += [tuple(boosts)]
+    
+    def get_substructures_checksum(block, utils_class):
+        return sum(struct.unpack(utils_class.enc_checksum_format, block)) & 0xFFFF
+    
+    def split_substructures(block, pid, utils_class):
+        offsets = utils_class.enc_offsets[pid % len(utils_class.enc_offsets)]
+        substructure_len = utils_class.substructure_len
+        return [list(block[offset:offset+substructure_len]) for offset in offsets]
+    
+    def decrypt_substructures(data, pos, pid, ot_id, utils_class):
+        """
+        Decrypts the substructures of a pokémon.
+        Returns growth, attacks, evs and misc, plus their checksum.
+        """
+        enc_block_len = utils_class.enc_block_len
+        key = ((pid ^ ot_id) & 0xFFFFFFFF) * utils_class.enc_key_spread
+        block = (int.from_bytes(bytes(data[pos:pos+enc_block_len]), byteorder="little") ^ key).to_bytes(enc_block_len, byteorder="little")
+        return utils_class.split_substructures(block, pid, utils_class), utils_class.get_substructures_checksum(block, utils_class)
+    
+    def decrypt_substructures_batch(data, positions, utils_class):
+        """
+        Decrypts the substructures of multiple pokémon (i.e. a whole
+        party) with a single XOR. positions are where each pokémon starts.
+        """
+        enc_block_len = utils_class.enc_block_len
+        enc_data_pos = RSESPTradingPokémonInfo.enc_data_pos
+        blocks = bytearray()
+        keys = bytearray()
+        pids = [0] * len(positions)
+        for i in range(len(positions)):
+            pids[i] = GSCUtilsMisc.read_int_le(data, positions[i] + RSESPTradingPokémonInfo.pid_pos)
+            ot_id = GSCUtilsMisc.read_int_le(data, positions[i] + RSESPTradingPokémonInfo.ot_id_pos)
+            blocks += bytes(data[positions[i]+enc_data_pos:positions[i]+enc_data_pos+enc_block_len])
+            keys += (((pids[i] ^ ot_id) & 0xFFFFFFFF) * utils_class.enc_key_spread).to_bytes(enc_block_len, byteorder="little")
+        blocks = (int.from_bytes(blocks, byteorder="little") ^ int.from_bytes(keys, byteorder="little")).to_bytes(len(blocks), byteorder="little")
+        ret = [None] * len(positions)
+        for i in range(len(positions)):
+            block = blocks[i*enc_block_len:(i+1)*enc_block_len]
+            ret[i] = (utils_class.split_substructures(block, pids[i], utils_class), utils_class.get_substructures_checksum(block, utils_class))
+        return ret
+    
+    def encrypt_substructures(substructures, pid, ot_id, utils_class):
+        """
+        Encrypts growth, attacks, evs and misc of a pokémon.
+        Returns the encrypted data, plus the checksum.
+        """
+        enc_block_len = utils_class.enc_block_len
+        order = utils_class.enc_orders[pid % len(utils_class.enc_orders)]
+        block = b"".join([bytes(substructures[i]) for i in order])
+        checksum = utils_class.get_substructures_checksum(block, utils_class)
+        key = ((pid ^ ot_id) & 0xFFFFFFFF) * utils_class.enc_key_spread
+        return list((int.from_bytes(block, byteorder="little") ^ key).to_bytes(enc_block_len, byteorder="little")), checksum
     
     def get_iv(iv, stat_id, utils_class):
         return iv[utils_class.stat_id_base_conv_table[stat_id]]
@@ -49,22 +132,11 @@ class RSESPUtils(GSCUtils):
         return math.floor(stat_exp / 4)
     
     def stat_calculation(stat_id, species, ivs, stat_exp, level, utils_class, nature=0, do_exp=True):
-        inter_value = ((2 * utils_class.get_base_stat(species, stat_id, utils_class)) + utils_class.get_iv(ivs, stat_id, utils_class))
+        inter_value = ((2 * utils_class.stat_bases[species][stat_id]) + utils_class.get_iv(ivs, stat_id, utils_class))
         if do_exp:
-            inter_value += utils_class.get_stat_exp_contribution(utils_class.get_exp(stat_exp, stat_id, utils_class))
-        inter_value = math.floor((inter_value*level)/100)
-        
-        stat_boosted = int(nature / 5) + 1
-        stat_nerfed = (nature  % 5) + 1
-        if stat_boosted == stat_nerfed:
-            stat_boosted = -1
-            stat_nerfed = -1
-        precise_stat_boost = 1.0
-        if(stat_id == stat_boosted):
-            precise_stat_boost = 1.1
-        if(stat_id == stat_nerfed):
-            precise_stat_boost = 0.9
-        return int((inter_value + utils_class.final_stat_calc_step(stat_id, level, utils_class))*precise_stat_boost)
+            inter_value += utils_class.stat_exp_contributions[utils_class.get_exp(stat_exp, stat_id, utils_class)]
+        inter_value = (inter_value*level) // 100
+        return int((inter_value + utils_class.final_stat_calc_step(stat_id, level, utils_class))*utils_class.nature_boosts[nature][stat_id])
     
     def is_item_mail(item):
         return (item >= 0x79) and (item <= 0x84)
@@ -170,44 +242,29 @@ class RSESPTradingPokémonInfo(GSCTradingPokémonInfo):
     
     all_lengths = [pokemon_data_len, mail_len, version_info_len, ribbon_info_len]
     
-    def __init__(self, data, start, length=pokemon_data_len, is_encrypted=True):
+    def __init__(self, data, start, length=pokemon_data_len, is_encrypted=True, decrypted=None):
         super(RSESPTradingPokémonInfo, self).__init__(data, start, length=length)
         self.pid = GSCUtilsMisc.read_int_le(self.values, self.pid_pos)
         self.ot_id = GSCUtilsMisc.read_int_le(self.values, self.ot_id_pos)
         self.is_valid = True
-        decrypted_data = []
-        enc_positions = self.utils_class.enc_positions
-        enc_data_len = self.enc_data_len
-        checksum = 0
+        enc_data_end = self.enc_data_pos + self.enc_data_len
         self.checksum_failed = False
         if not is_encrypted:
-            for i in range(int(enc_data_len/4)):
-                single_entry_dec = GSCUtilsMisc.read_int_le(self.values, self.enc_data_pos+(i*4))
-                checksum = (checksum + single_entry_dec) & 0xFFFF
-                checksum = (checksum + (single_entry_dec>>16)) & 0xFFFF
+            checksum = self.utils_class.get_substructures_checksum(bytes(self.values[self.enc_data_pos:enc_data_end]), self.utils_class)
             if checksum != GSCUtilsMisc.read_short_le(self.values, self.checksum_pos):
                 self.is_valid = False
                 self.checksum_failed = True
-            self.growth = self.values[self.enc_data_pos + (int(enc_data_len/4)*0):self.enc_data_pos + (int(enc_data_len/4)*1)]
-            self.attacks = self.values[self.enc_data_pos + (int(enc_data_len/4)*1):self.enc_data_pos + (int(enc_data_len/4)*2)]
-            self.evs = self.values[self.enc_data_pos + (int(enc_data_len/4)*2):self.enc_data_pos + (int(enc_data_len/4)*3)]
-            self.misc = self.values[self.enc_data_pos + (int(enc_data_len/4)*3):self.enc_data_pos + (int(enc_data_len/4)*4)]
+            substructure_len = self.utils_class.substructure_len
+            self.growth, self.attacks, self.evs, self.misc = [self.values[i:i+substructure_len] for i in range(self.enc_data_pos, enc_data_end, substructure_len)]
             self.encrypt_data()
-        checksum = 0
-        for i in range(int(enc_data_len/4)):
-            single_entry_dec = GSCUtilsMisc.read_int_le(self.values, self.enc_data_pos+(i*4))^self.pid^self.ot_id
-            for j in range(4):
-                decrypted_data += [(single_entry_dec>>(8*j)) & 0xFF]
-            checksum = (checksum + single_entry_dec) & 0xFFFF
-            checksum = (checksum + (single_entry_dec>>16)) & 0xFFFF
+            decrypted = None
+        if decrypted is None:
+            decrypted = self.utils_class.decrypt_substructures(self.values, self.enc_data_pos, self.pid, self.ot_id, self.utils_class)
+        substructures, checksum = decrypted
         if checksum != GSCUtilsMisc.read_short_le(self.values, self.checksum_pos):
             self.is_valid = False
             self.checksum_failed = True
-        index = self.pid % len(enc_positions)
-        self.growth = decrypted_data[int(enc_data_len/4)*((enc_positions[index]>>0)&3):int(enc_data_len/4)*(((enc_positions[index]>>0)&3)+1)]
-        self.attacks = decrypted_data[int(enc_data_len/4)*((enc_positions[index]>>2)&3):int(enc_data_len/4)*(((enc_positions[index]>>2)&3)+1)]
-        self.evs = decrypted_data[int(enc_data_len/4)*((enc_positions[index]>>4)&3):int(enc_data_len/4)*(((enc_positions[index]>>4)&3)+1)]
-        self.misc = decrypted_data[int(enc_data_len/4)*((enc_positions[index]>>6)&3):int(enc_data_len/4)*(((enc_positions[index]>>6)&3)+1)]
+        self.growth, self.attacks, self.evs, self.misc = substructures
         self.version_info = [0, 0]
         self.ribbon_info = [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
         if self.is_valid:
@@ -264,34 +321,10 @@ class RSESPTradingPokémonInfo(GSCTradingPokémonInfo):
         return 0
 
     def encrypt_data(self):
-        enc_positions = self.utils_class.enc_positions
-        enc_data_len = self.enc_data_len
-        index = self.pid % len(enc_positions)
-        decrypted_data = []
-        encrypted_data = []
-        for i in range(4):
-            for j in range(4):
-                value = (enc_positions[index]>>(2*j))&3
-                if value == i:
-                    if j == 0:
-                        decrypted_data += self.growth
-                    elif j == 1:
-                        decrypted_data += self.attacks
-                    elif j == 2:
-                        decrypted_data += self.evs
-                    elif j == 3:
-                        decrypted_data += self.misc
-        checksum = 0
-        for i in range(int(enc_data_len/4)):
-            single_entry_dec = GSCUtilsMisc.read_int_le(decrypted_data, i*4)
-            checksum = (checksum + single_entry_dec) & 0xFFFF
-            checksum = (checksum + (single_entry_dec>>16)) & 0xFFFF
-            single_entry_dec ^= self.pid^self.ot_id
-            for j in range(4):
-                encrypted_data += [(single_entry_dec>>(8*j)) & 0xFF]
+        encrypted_data, checksum = self.utils_class.encrypt_substructures([self.growth, self.attacks, self.evs, self.misc], self.pid, self.ot_id, self.utils_class)
         if self.checksum_failed:
             checksum += 1
-        self.values[self.enc_data_pos:self.enc_data_pos + (int(enc_data_len/4)*4)] = encrypted_data
+        self.values[self.enc_data_pos:self.enc_data_pos + self.enc_data_len] = encrypted_data
         GSCUtilsMisc.write_short_le(self.values, self.checksum_pos, checksum)
     
     def get_has_second_ability(self):
@@ -422,8 +455,12 @@ class RSESPTradingPokémonInfo(GSCTradingPokémonInfo):
         """
         old_max_hps = self.get_max_hp()
         old_current_hps = self.get_curr_hp()
+        mon_index = self.get_mon_index()
+        ivs = self.get_ivs()
+        stat_exp = self.get_stat_exp()
+        level = self.get_level()
         for i in range(self.utils_class.num_stats):
-            GSCUtilsMisc.write_short_le(self.values, self.stats_pos + (i * 2), self.utils_class.stat_calculation(i, self.get_mon_index(), self.get_ivs(), self.get_stat_exp(), self.get_level(), self.utils_class))
+            GSCUtilsMisc.write_short_le(self.values, self.stats_pos + (i * 2), self.utils_class.stat_calculation(i, mon_index, ivs, stat_exp, level, self.utils_class))
         new_max_hps = self.get_max_hp()
         old_current_hps += new_max_hps-old_max_hps
         GSCUtilsMisc.write_short_le(self.values, self.curr_hp_pos, min(max(0, old_current_hps), new_max_hps))
@@ -467,6 +504,13 @@ class RSESPTradingPokémonInfo(GSCTradingPokémonInfo):
         """
         return True
     
+    def get_fingerprint(self, weak=False):
+        """
+        is_equal is always True, so every pokémon shares the fingerprint
+        and the search returns the first one, like the linear scan did.
+        """
+        return ()
+    
     def has_changed_significantly(self, raw):
         """
         Returns whether a pokémon has changed too much due to the sanity
@@ -545,8 +589,11 @@ class RSESPTradingData(GSCTradingData):
     def __init__(self, data_pokemon, data_mail=None, do_full=True):
         super(RSESPTradingData, self).__init__(data_pokemon, data_mail=None, do_full=False)
         if do_full:
+            positions = [self.trading_pokemon_pos + i * self.trading_pokemon_length for i in range(self.get_party_size())]
+            utils_class = self.get_utils_class()
+            decrypted = utils_class.decrypt_substructures_batch(data_pokemon, positions, utils_class)
             for i in range(self.get_party_size()):
-                self.pokemon += [self.mon_generator(data_pokemon, self.trading_pokemon_pos + i * self.trading_pokemon_length)]
+                self.pokemon += [self.mon_generator_class()(data_pokemon, positions[i], decrypted=decrypted[i])]
                 if self.pokemon[i].has_mail():
                     self.pokemon[i].add_mail(data_pokemon, self.trading_mail_pos + self.pokemon[i].get_mail_id() * self.trading_mail_length)
                 else:
@@ -554,59 +601,32 @@ class RSESPTradingData(GSCTradingData):
                 self.pokemon[i].add_version_info(data_pokemon, self.game_id_pos + 1)
                 self.pokemon[i].add_ribbon_info(data_pokemon, self.ribbon_info_pos)
 
+    def get_checksum_ranges(cls, lengths):
+        """
+        Returns the start, the number of words and the checksum's position
+        of each checksummed range, in the order they must be generated.
+        """
+        return [
+            (cls.trading_mail_pos, int((cls.trading_party_max_size*cls.trading_mail_length)/4), cls.trading_mail_pos+(cls.trading_party_max_size*cls.trading_mail_length)),
+            (cls.trading_party_info_pos, 1 + int((cls.trading_party_max_size*cls.trading_pokemon_length)/4), cls.trading_pokemon_pos+(cls.trading_party_max_size*cls.trading_pokemon_length)),
+            (0, int((lengths[0]-4)/4), lengths[0]-4)
+        ]
+    
+    def sum_words(buf, start, num_words):
+        return sum(struct.unpack("<" + str(num_words) + "I", bytes(buf[start:start+(num_words*4)]))) & 0xFFFFFFFF
+    
     def are_checksum_valid(cls, buf, lengths):
-        checksum = 0
-        for i in range(cls.trading_party_max_size):
-            for j in range(int(cls.trading_mail_length/4)):
-                checksum = (checksum + GSCUtilsMisc.read_int_le(buf, (i*cls.trading_mail_length) + (j*4) + cls.trading_mail_pos)) & 0xFFFFFFFF
-        
-        if(GSCUtilsMisc.read_int_le(buf, cls.trading_mail_pos+(cls.trading_party_max_size*cls.trading_mail_length)) != checksum):
-            return 0
-
-        checksum = GSCUtilsMisc.read_int_le(buf, cls.trading_party_info_pos)
-        
-        for i in range(cls.trading_party_max_size):
-            for j in range(int(cls.trading_pokemon_length/4)):
-                checksum = (checksum + GSCUtilsMisc.read_int_le(buf, (i*cls.trading_pokemon_length) + (j*4) + cls.trading_pokemon_pos)) & 0xFFFFFFFF
-        
-        if(GSCUtilsMisc.read_int_le(buf, cls.trading_pokemon_pos+(cls.trading_party_max_size*cls.trading_pokemon_length)) != checksum):
-            return 0
-        
-        checksum = 0;
-        
-        for i in range(int((lengths[0]-4)/4)):
-            checksum = (checksum + GSCUtilsMisc.read_int_le(buf, i*4)) & 0xFFFFFFFF
-        
-        if(GSCUtilsMisc.read_int_le(buf, lengths[0]-4) != checksum):
-            return 0
-        
+        for start, num_words, checksum_pos in cls.get_checksum_ranges(cls, lengths):
+            if GSCUtilsMisc.read_int_le(buf, checksum_pos) != cls.sum_words(buf, start, num_words):
+                return 0
         return 1
     
     def get_empty_mail(self):
         return [0] * self.trading_mail_length
     
     def generate_checksum(cls, buf, lengths):
-        checksum = 0
-        for i in range(cls.trading_party_max_size):
-            for j in range(int(cls.trading_mail_length/4)):
-                checksum = (checksum + GSCUtilsMisc.read_int_le(buf, (i*cls.trading_mail_length) + (j*4) + cls.trading_mail_pos)) & 0xFFFFFFFF
-        
-        GSCUtilsMisc.write_int_le(buf, cls.trading_mail_pos+(cls.trading_party_max_size*cls.trading_mail_length), checksum)
-
-        checksum = GSCUtilsMisc.read_int_le(buf, cls.trading_party_info_pos)
-        
-        for i in range(cls.trading_party_max_size):
-            for j in range(int(cls.trading_pokemon_length/4)):
-                checksum = (checksum + GSCUtilsMisc.read_int_le(buf, (i*cls.trading_pokemon_length) + (j*4) + cls.trading_pokemon_pos)) & 0xFFFFFFFF
-        
-        GSCUtilsMisc.write_int_le(buf, cls.trading_pokemon_pos+(cls.trading_party_max_size*cls.trading_pokemon_length), checksum)
-        
-        checksum = 0;
-        
-        for i in range(int((lengths[0]-4)/4)):
-            checksum = (checksum + GSCUtilsMisc.read_int_le(buf, i*4)) & 0xFFFFFFFF
-        
-        GSCUtilsMisc.write_int_le(buf, lengths[0]-4, checksum)
+        for start, num_words, checksum_pos in cls.get_checksum_ranges(cls, lengths):
+            GSCUtilsMisc.write_int_le(buf, checksum_pos, cls.sum_words(buf, start, num_words))
     
     def party_generator(self, data, pos):
         return RSESPTradingPartyInfo(data, pos)
@@ -623,18 +643,8 @@ class RSESPTradingData(GSCTradingData):
     def get_utils_class(self):
         return RSESPUtils
     
-    def search_for_mon(self, mon, is_egg):
-        """
-        Returns None if a provided pokémon is not in the party.
-        Otherwise, it returns their index.
-        """
-        for i in range(self.get_party_size()):
-            if mon.is_equal(self.pokemon[i]):
-                return i
-        for i in range(self.get_party_size()):
-            if mon.is_equal(self.pokemon[i], weak=True):
-                return i
-        return None
+    def get_search_key(self, fingerprint, is_egg):
+        return fingerprint
 
     @GSCTradingData.check_pos_validity
     def is_mon_egg(self, pos):
@@ -671,6 +681,59 @@ class RSESPTradingData(GSCTradingData):
         type(self).generate_checksum(type(self), data, lengths)
         return [data]
 
+class RSESPChecksumTracker:
+    """
+    Class which keeps the checksums of a trading data buffer
+    up to date while it is received 16 bits at a time.
+    """
+    def __init__(self, data_class, buf, lengths):
+        self.ranges = data_class.get_checksum_ranges(data_class, lengths)
+        self.sums = [0] * len(self.ranges)
+        self.chunk_masks = [0] * len(self.ranges)
+        for i in range(len(self.ranges)):
+            start, num_words, checksum_pos = self.ranges[i]
+            self.sums[i] = data_class.sum_words(buf, start, num_words)
+            # Each word is made of two chunks
+            self.chunk_masks[i] = (((1 << (num_words * 2)) - 1) << (start >> 1)) | (3 << (checksum_pos >> 1))
+    
+    def update(self, buf, index, value):
+        """
+        Writes a 16 bits chunk to the buffer, updating the checksums.
+        """
+        pos = index * 2
+        value &= 0xFFFF
+        delta = (value - GSCUtilsMisc.read_short_le(buf, pos)) << ((pos & 2) * 8)
+        for i in range(len(self.ranges)):
+            start, num_words, _ = self.ranges[i]
+            if start <= pos < (start + (num_words * 4)):
+                self.sums[i] += delta
+        GSCUtilsMisc.write_short_le(buf, pos, value)
+    
+    def is_range_valid(self, buf, index):
+        return GSCUtilsMisc.read_int_le(buf, self.ranges[index][2]) == (self.sums[index] & 0xFFFFFFFF)
+    
+    def are_checksum_valid(self, buf):
+        for i in range(len(self.ranges)):
+            if not self.is_range_valid(buf, i):
+                return 0
+        return 1
+    
+    def get_failed_chunks(self, buf):
+        """
+        Returns a bitmap of the chunks covered by a failed checksum,
+        except for those inside a smaller range with a valid one.
+        """
+        valid = [self.is_range_valid(buf, i) for i in range(len(self.ranges))]
+        failed_chunks = 0
+        for i in range(len(self.ranges)):
+            if not valid[i]:
+                mask = self.chunk_masks[i]
+                for j in range(len(self.ranges)):
+                    if (j != i) and valid[j] and ((self.chunk_masks[j] & mask) == self.chunk_masks[j]):
+                        mask &= ~self.chunk_masks[j]
+                failed_chunks |= mask
+        return failed_chunks
+
 class RSESPChecks(GSCChecks):
     """
     Class which handles sanity checks and cleaning of the received data.
@@ -688,6 +751,13 @@ class RSESPChecks(GSCChecks):
     def get_utils_class(self):
         return RSESPUtils
     
+    def get_run_check_functions(self):
+        run_functions = super(RSESPChecks, self).get_run_check_functions()
+        # Items are not checked, and types depend on the species
+        run_functions[self.clean_item] = self.clean_nothing_run
+        run_functions.pop(self.clean_type)
+        return run_functions
+    
     @GSCChecks.clean_check_sanity_checks
     def clean_species(self, species):
         self.type_pos = 0
@@ -1,8 +1,11 @@
 import time
 import asyncio
 import json
+import queue
+import threading
 import websockets
-from asyncio import Queue, Lock, Event
+from asyncio import Queue, Event
+from concurrent.futures import Future
 
 # Constants
 CMD_MASTER_READY = 0x29; RESP_READY = 0x55; CMD_START_A = 0x60; CMD_START_B = 0x79;
@@ -10,12 +13,28 @@ CMD_GO_1 = 0x30; CMD_ZERO = 0x00; CMD_POLL = 0x02; CMD_FINAL = 0x43;
 MUSIC_NEXT = 0x50; WIN_CODE = 0xAA; LOSE_CODE = 0x77; GB_WIN = 0x77;
 GB_LOSE = 0xAA; GB_FILL_DONE = 0xFF;
 
+# Link timing (seconds). A Game Boy frame is 70224 cycles at 4.194304 MHz (~59.7 Hz)
+GB_FRAME_TIME = 70224 / 4194304; DEFAULT_FRAMES_PER_POLL = 3;
+FORCE_END_INTERVAL = 0.05; IDLE_INTERVAL = 0.02;
+# Height updates: at most one per HEIGHT_UPDATE_INTERVAL, unchanged ones once per HEIGHT_REFRESH_INTERVAL
+HEIGHT_UPDATE_INTERVAL = 0.1; HEIGHT_REFRESH_INTERVAL = 1.0;
+# Clock sync with the server: bursts of samples, the one with the shortest round trip is kept
+TIME_SYNC_SAMPLES = 5; TIME_SYNC_SPACING = 0.05; TIME_SYNC_TIMEOUT = 1.0; TIME_SYNC_INTERVAL = 30;
+# Scheduled starts: the last moments are spun for precision, far away ones are clamped
+START_SPIN_TIME = 0.002; MAX_START_WAIT = 5.0;
+
 # Music selection bytes
 MUSIC_A = 0x1C
 MUSIC_B = 0x1D
 MUSIC_C = 0x1E
 MUSIC_OFF = 0x1F
 
+# Precomputed server messages
+HEIGHT_MESSAGES = [json.dumps({"type": "update", "height": h}) for h in range(0x14)]
+LINES_MESSAGES = {rx: json.dumps({"type": "lines", "lines": rx}) for rx in range(0x80, 0x86)}
+WIN_MESSAGE = json.dumps({"type": "win"})
+DEAD_MESSAGE = json.dumps({"type": "dead"})
+
 def hex_to_bytes(val):
     """Converts a hex string to a bytes object."""
     if not val: return b""
@@ -31,32 +50,168 @@ def is_first_game(users):
     """Checks if any user has wins, determining if it's the first game."""
     return not any(int(u.get("num_wins", 0)) > 0 for u in users)
 
+class TetrisLinkIO(threading.Thread):
+    """
+    Dedicated thread which owns the link. It plays byte sequences
+    and, during a match, polls the Game Boy, so link timing never
+    blocks the asyncio event loop.
+    """
+    def __init__(self, link_low, owner, frames_per_poll=DEFAULT_FRAMES_PER_POLL):
+        super().__init__(daemon=True)
+        # Also rejects NaN, a zero period would kill the thread at the first deadline
+        if not frames_per_poll > 0:
+            raise ValueError(f"frames_per_poll must be greater than 0, not {frames_per_poll}")
+        self.link = link_low
+        self.owner = owner
+        self.jobs = queue.Queue()
+        self.loop = None
+        self.running = True
+        self.poll_period = GB_FRAME_TIME * frames_per_poll
+        self.missed_polls = 0
+        self.start_error = None
+
+    def compile(self, sequence):
+        """Compiles (byte, delay) pairs into batched transfers, if the link supports it."""
+        if hasattr(self.link, "compile_sequence"):
+            return self.link.compile_sequence(sequence)
+        return sequence
+
+    def submit(self, sequence, at=None):
+        """
+        Queues (byte, delay) pairs or a compiled sequence. The future gets the received bytes.
+        If at is set, the sequence starts at that time.monotonic() instant.
+        """
+        future = Future()
+        self.jobs.put((sequence, future, at))
+        return future
+
+    def run_sequence(self, sequence):
+        """Plays a sequence, blocking until it's done."""
+        return self.submit(sequence).result()
+
+    async def run_sequence_async(self, sequence):
+        """Plays a sequence without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(sequence))
+
+    def stop(self):
+        self.running = False
+        self.jobs.put(None)
+        self.join(1)
+
+    def _play(self, sequence):
+        if isinstance(sequence, list):
+            sequence = self.compile(sequence)
+        if not isinstance(sequence, list):
+            return self.link.xfer_sequence(sequence)
+        received = []
+        for byte, delay in sequence:
+            received.append(self.link.xfer_byte(byte))
+            if delay: time.sleep(delay)
+        return received
+
+    def _wait_until(self, deadline):
+        """Sleeps until the deadline, then spins for the last moments. Records how late it was."""
+        remaining = deadline - time.monotonic()
+        if remaining > START_SPIN_TIME: time.sleep(remaining - START_SPIN_TIME)
+        # sleep(0) lets the event loop thread run while spinning
+        while time.monotonic() < deadline: time.sleep(0)
+        self.start_error = time.monotonic() - deadline
+
+    def _poll(self):
+        """Exchanges one byte of the match and hands the answer to the event loop."""
+        try: byte_to_send = self.owner.gb_tx_queue.get_nowait()
+        except queue.Empty: byte_to_send = self.owner.opponent_height
+        received_byte = self.link.xfer_byte(byte_to_send)
+        self.loop.call_soon_threadsafe(self.owner.gb_rx_queue.put_nowait, (received_byte, time.monotonic()))
+
+    def _next_deadline(self, deadline):
+        """Moves to the next frame-aligned deadline, skipping the missed ones instead of bursting."""
+        deadline += self.poll_period
+        now = time.monotonic()
+        if deadline < now:
+            missed = int((now - deadline) / self.poll_period) + 1
+            self.missed_polls += missed
+            deadline += missed * self.poll_period
+        return deadline
+
+    def run(self):
+        next_poll = None
+        try:
+            while self.running:
+                polling = self.owner.in_match and self.loop is not None
+                if not polling:
+                    next_poll = None
+                    timeout = IDLE_INTERVAL
+                elif next_poll is None:
+                    timeout = 0
+                else:
+                    timeout = max(0, next_poll - time.monotonic())
+                try:
+                    job = self.jobs.get(timeout=timeout)
+                    if job is None: break
+                    sequence, future, at = job
+                    # The waiting task was cancelled, the sequence isn't wanted anymore
+                    if not future.set_running_or_notify_cancel(): continue
+                    if at is not None: self._wait_until(at)
+                    try: future.set_result(self._play(sequence))
+                    except Exception as e: future.set_exception(e)
+                    # Polling restarts from the end of the sequence
+                    next_poll = None
+                except queue.Empty:
+                    if polling:
+                        if next_poll is None: next_poll = time.monotonic()
+                        self._poll()
+                        next_poll = self._next_deadline(next_poll)
+        finally:
+            print("[GB] IO loop stopped.")
+
 class TetrisLink:
-    def __init__(self, link_low):
+    def __init__(self, link_low, frames_per_poll=DEFAULT_FRAMES_PER_POLL, sync_start=True):
         self.link = link_low
         self.link.set_mode(3)
         self.opponent_height = 0
         self.pico_uuid = None
+        self.server_time_sync = False
         self.latest_users = []
         self.garbage_data = b""
         self.game_over_event = Event()
-        self.gb_tx_queue = Queue()
+        self.gb_tx_queue = queue.Queue()
         self.gb_rx_queue = Queue()
         self.in_match = False
-        self.link_lock = Lock()
+        self.start_task = None
+        self.line_latencies = []
+        self.last_game_info = None
+        self.sent_height = None
+        self.pending_height = None
+        self.last_height_time = 0
+        self.sync_start = sync_start
+        # Server clock minus time.monotonic(), None until measured
+        self.clock_offset = None
+        self.clock_rtt = None
+        self.time_sync_replies = Queue()
+        self.io = TetrisLinkIO(link_low, self, frames_per_poll)
+        self.io.start()
+
+    def close(self):
+        """Stops the link thread. Call it before shutting the link down."""
+        self.io.stop()
 
     async def run(self, ws, host_mode):
         """Main entry point to start all concurrent tasks for a Tetris match."""
         print("WebSocket connected!")
+        self.io.loop = asyncio.get_running_loop()
         await ws.send(json.dumps({"type": "register", "name": "PiZero_Player"}))
         
         server_listener = asyncio.create_task(self._server_listener_loop(ws))
-        io_task = asyncio.create_task(self._gb_io_loop())
         rx_task = asyncio.create_task(self._gb_rx_processor_loop(ws))
+        sync_task = None
         
         print("Waiting for lobby information from server...")
         while not self.pico_uuid:
             await asyncio.sleep(0.05)
+        # Only servers which advertise it answer time_sync
+        if self.sync_start and self.server_time_sync:
+            sync_task = asyncio.create_task(self._clock_sync_loop(ws))
         
         try:
             if host_mode:
@@ -66,8 +221,9 @@ class TetrisLink:
         finally:
             # Cleanly shut down all tasks when the game loop ends
             server_listener.cancel()
-            io_task.cancel()
             rx_task.cancel()
+            if self.start_task: self.start_task.cancel()
+            if sync_task: sync_task.cancel()
 
     async def _host_game_loop(self, ws):
         """Loop for the host player, allowing them to start rounds."""
@@ -93,20 +249,27 @@ class TetrisLink:
             try:
                 msg = await ws.recv()
                 if not msg: continue
+                # The lobby state is resent often, usually unchanged
+                if msg == self.last_game_info: continue
                 data = json.loads(msg)
                 msg_type = data.get("type")
                 
-                if msg_type != "game_info": print(f"[Server] Received: {msg_type}")
+                if msg_type not in ("game_info", "time_sync"): print(f"[Server] Received: {msg_type}")
 
-                if msg_type == "user_info": self.pico_uuid = data.get("uuid")
+                if msg_type == "time_sync":
+                    self.time_sync_replies.put_nowait((data.get("client_time"), data.get("server_time"), time.monotonic()))
+                elif msg_type == "user_info":
+                    self.server_time_sync = bool(data.get("time_sync"))
+                    self.pico_uuid = data.get("uuid")
                 elif msg_type == "game_info":
+                    self.last_game_info = msg
                     self.latest_users = data.get("users", [])
                     self._update_opponent_height()
                     if not self.in_match and not lobby_code_printed and data.get("name"):
                         print(f"\n==== LOBBY CODE: {data['name']} ====\n")
                         lobby_code_printed = True
                 elif msg_type == "garbage": self.garbage_data = hex_to_bytes(data.get("garbage"))
-                elif msg_type == "lines": await self.gb_tx_queue.put(data.get("lines", 0) & 0xFF)
+                elif msg_type == "lines": self.gb_tx_queue.put_nowait(data.get("lines", 0) & 0xFF)
                 elif msg_type == "win" or msg_type == "reached_30_lines": await self.end_match_from_server(won=True)
                 elif msg_type == "dead": await self.end_match_from_server(won=False)
                 elif msg_type == "error":
@@ -115,18 +278,70 @@ class TetrisLink:
                     break
                 elif msg_type == "start_game":
                     print("[Game] Starting new match...")
-                    self.in_match = True
                     tiles = hex_to_bytes(data.get("tiles"))
-                    await self.start_game_sequence(tiles, self.garbage_data, is_first_game(self.latest_users))
+                    at = self._local_start_time(data.get("start_at"))
+                    started = self.queue_start_sequence(tiles, self.garbage_data, is_first_game(self.latest_users), at)
+                    # The sequence plays on the link thread, lines/win/dead keep being read meanwhile
+                    self.start_task = asyncio.create_task(self._wait_game_started(started, at))
             except Exception as e:
                 print(f"Server listener error: {e}")
                 if self.in_match: await self.end_match_from_server(won=False)
                 break
 
+    async def sync_clock(self, ws):
+        """
+        Estimates the server's clock offset, NTP-style. Each sample assumes
+        the reply was stamped halfway through its round trip, so the sample
+        with the shortest round trip has the smallest error.
+        """
+        best = None
+        while not self.time_sync_replies.empty(): self.time_sync_replies.get_nowait()
+        for _ in range(TIME_SYNC_SAMPLES):
+            sent = time.monotonic()
+            await ws.send(json.dumps({"type": "time_sync", "client_time": sent}))
+            try:
+                while True:
+                    client_time, server_time, received = await asyncio.wait_for(self.time_sync_replies.get(), TIME_SYNC_TIMEOUT)
+                    # Late replies to earlier samples are skipped
+                    if client_time == sent: break
+            except asyncio.TimeoutError:
+                continue
+            rtt = received - sent
+            if best is None or rtt < best[0]:
+                best = (rtt, server_time - (sent + received) / 2)
+            await asyncio.sleep(TIME_SYNC_SPACING)
+        if best is not None:
+            self.clock_rtt, self.clock_offset = best
+            print(f"[Server] Clock offset {self.clock_offset * 1000:.1f} ms (round trip {self.clock_rtt * 1000:.1f} ms)")
+
+    async def _clock_sync_loop(self, ws):
+        """Keeps the clock offset fresh, outside of matches."""
+        while True:
+            if not self.in_match: await self.sync_clock(ws)
+            await asyncio.sleep(TIME_SYNC_INTERVAL)
+
+    def _local_start_time(self, start_at):
+        """Converts the server's start time to time.monotonic(), None to start right away."""
+        if start_at is None or self.clock_offset is None or not self.sync_start: return None
+        return min(start_at - self.clock_offset, time.monotonic() + MAX_START_WAIT)
+
+    def report_latency(self):
+        """Prints how long line clears took from the link to the server during the match."""
+        if self.line_latencies:
+            latencies = sorted(self.line_latencies)
+            avg = sum(latencies) / len(latencies)
+            print(f"[Game] Line clear to server: {len(latencies)} events, avg {avg * 1000:.1f} ms, "
+                  f"max {latencies[-1] * 1000:.1f} ms (polling every {self.io.poll_period * 1000:.1f} ms, {self.io.missed_polls} polls missed)")
+        self.line_latencies = []
+        self.io.missed_polls = 0
+
     def _update_opponent_height(self):
         """Calculates the max height of all opponents in the lobby."""
-        heights = [u.get("height", 0) for u in self.latest_users if u.get("uuid") != self.pico_uuid]
-        self.opponent_height = max(heights) if heights else 0
+        height = 0
+        for u in self.latest_users:
+            if u.get("uuid") != self.pico_uuid:
+                height = max(height, u.get("height", 0))
+        self.opponent_height = height
 
     async def handshake(self, max_seconds=7):
         """Performs the initial handshake with the Game Boy."""
@@ -135,7 +350,7 @@ class TetrisLink:
         while (time.monotonic() - start_time) < max_seconds:
             try:
                 # Send the ready command and get the response
-                received_byte = self.link.xfer_byte(CMD_MASTER_READY)
+                received_byte = (await self.io.run_sequence_async([(CMD_MASTER_READY, 0)]))[0]
                 
                 # Check if the response is what we expect
                 if received_byte == RESP_READY:
@@ -156,115 +371,138 @@ class TetrisLink:
     
     def send_music(self, music_byte, count=5):
         """Sends music selection byte to Game Boy multiple times (for preview)."""
-        for _ in range(count):
-            self.link.xfer_byte(music_byte)
-            time.sleep(0.1)
+        self.io.run_sequence([(music_byte, 0.1)] * count)
     
     def confirm_music(self):
         """Sends MUSIC_NEXT (0x50) to confirm music selection and move to handicap screen."""
-        self.link.xfer_byte(MUSIC_NEXT)
-        time.sleep(0.1)
+        self.io.run_sequence([(MUSIC_NEXT, 0.1)])
     
     def complete_handicap_phase(self, count=5):
         """Sends zeros to pass through the handicap selection screen."""
-        for _ in range(count):
-            self.link.xfer_byte(CMD_ZERO)
-            time.sleep(0.1)
+        self.io.run_sequence([(CMD_ZERO, 0.1)] * count)
         
     async def prepare_after_handshake(self, music_choice=MUSIC_A):
         """Legacy function - use send_music, confirm_music, complete_handicap_phase instead."""
         print("[GB] Preparing menus...")
-        for _ in range(3): self.link.xfer_byte(music_choice); await asyncio.sleep(0.1)
-        self.link.xfer_byte(MUSIC_NEXT); await asyncio.sleep(0.1)
-        for _ in range(2): self.link.xfer_byte(CMD_ZERO); await asyncio.sleep(0.1)
+        await self.io.run_sequence_async([(music_choice, 0.1)] * 3 + [(MUSIC_NEXT, 0.1)] + [(CMD_ZERO, 0.1)] * 2)
         print("[GB] Ready for match start.")
         
-    async def start_game_sequence(self, tiles_bytes, garbage_bytes, is_first_game: bool):
-        """Sends the specific byte sequence to start a match on the Game Boy."""
-        print("[GB] Starting game sequence...")
+    def build_start_sequence(self, tiles_bytes, garbage_bytes, is_first_game: bool):
+        """Builds the (byte, delay) pairs which start a match on the Game Boy."""
         if is_first_game:
-            self.link.xfer_byte(CMD_START_A); time.sleep(0.15)
-            self.link.xfer_byte(CMD_MASTER_READY); time.sleep(0.004)
+            sequence = [(CMD_START_A, 0.15), (CMD_MASTER_READY, 0.004)]
+        else:
+            sequence = [(CMD_START_A, 0.07)] + [(CMD_POLL, 0.07)] * 3
+            sequence += [(CMD_START_B, 0.33), (CMD_START_A, 0.15), (CMD_MASTER_READY, 0.07)]
+        sequence += [(byte, 0.004) for byte in garbage_bytes]
+        sequence += [(CMD_MASTER_READY, 0.008)]
+        sequence += [(byte, 0.004) for byte in tiles_bytes]
+        sequence += [(b, 0.07) for b in (CMD_GO_1, CMD_ZERO, CMD_POLL, CMD_POLL, 0x20)]
+        return sequence
+
+    def queue_start_sequence(self, tiles_bytes, garbage_bytes, is_first_game: bool, at=None):
+        """
+        Queues the byte sequence which starts a match on the Game Boy and enters the match.
+        If at is set, the sequence is compiled now and fired at that time.monotonic() instant,
+        so every player of the lobby starts together. Returns the sequence's future.
+        """
+        print("[GB] Starting game sequence...")
+        self.sent_height = None
+        self.pending_height = None
+        sequence = self.io.compile(self.build_start_sequence(tiles_bytes, garbage_bytes, is_first_game))
+        # The link thread only starts polling once the sequence is done
+        started = self.io.submit(sequence, at)
+        self.in_match = True
+        return started
+
+    async def start_game_sequence(self, tiles_bytes, garbage_bytes, is_first_game: bool, at=None):
+        """Sends the specific byte sequence to start a match on the Game Boy, waiting until it's done."""
+        await self._wait_game_started(self.queue_start_sequence(tiles_bytes, garbage_bytes, is_first_game, at), at)
+
+    async def _wait_game_started(self, started, at):
+        try:
+            await asyncio.wrap_future(started)
+        except Exception as e:
+            print(f"[GB] Start sequence error: {e}")
+            return
+        if at is not None:
+            print(f"[GB] Game started! Sequence fired {self.io.start_error * 1000:.2f} ms after the agreed time.")
         else:
-            self.link.xfer_byte(CMD_START_A); time.sleep(0.07)
-            for _ in range(3): self.link.xfer_byte(CMD_POLL); time.sleep(0.07)
-            self.link.xfer_byte(CMD_START_B); time.sleep(0.33)
-            self.link.xfer_byte(CMD_START_A); time.sleep(0.15)
-            self.link.xfer_byte(CMD_MASTER_READY); time.sleep(0.07)
-        for byte in garbage_bytes: self.link.xfer_byte(byte); time.sleep(0.004)
-        self.link.xfer_byte(CMD_MASTER_READY); time.sleep(0.008)
-        for byte in tiles_bytes: self.link.xfer_byte(byte); time.sleep(0.004)
-        for b in (CMD_GO_1, CMD_ZERO, CMD_POLL, CMD_POLL, 0x20):
-            self.link.xfer_byte(b); time.sleep(0.07)
-        print("[GB] Game started!")
+            print("[GB] Game started!")
 
     async def end_match_from_server(self, won):
         """Forces the match to end from the server's perspective."""
         if not self.in_match: return
+        # Cleared first, so a second end (our win and the server's) doesn't run while this one waits
+        self.in_match = False
         
         sequence = (WIN_CODE, CMD_POLL, CMD_POLL, CMD_POLL, CMD_FINAL) if won else \
                    (LOSE_CODE, CMD_POLL, CMD_POLL, CMD_POLL, CMD_FINAL)
-        for b in sequence:
-            self.gb_tx_queue.put_nowait(b)
+        # Bytes still waiting for the Game Boy go out first, as before
+        pending = []
+        while not self.gb_tx_queue.empty():
+            try: pending.append(self.gb_tx_queue.get_nowait())
+            except queue.Empty: break
             
         print("[GB] Sending force-end sequence...")
-        while not self.gb_tx_queue.empty():
-            await asyncio.sleep(0.1)
+        await self.io.run_sequence_async([(b, FORCE_END_INTERVAL) for b in pending + list(sequence)])
         print("[GB] Force-end sequence sent.")
 
         print(f"[Game] Match ended by server. Player {'WON' if won else 'LOST'}.")
-        self.in_match = False
+        self.report_latency()
         self.game_over_event.set()
 
-    async def _gb_io_loop(self):
-        """The main loop for exchanging data with the Game Boy during a match."""
-        try:
-            while True:
-                if not self.in_match:
-                    await asyncio.sleep(0.02)
-                    continue
-                
-                byte_to_send = self.opponent_height
-                if not self.gb_tx_queue.empty():
-                    byte_to_send = self.gb_tx_queue.get_nowait()
-                
-                async with self.link_lock:
-                    received_byte = self.link.xfer_byte(byte_to_send)
-                
-                await self.gb_rx_queue.put(received_byte)
-                await asyncio.sleep(0.05)
-        except asyncio.CancelledError:
-            pass
-        finally:
-            print("[GB] IO loop stopped.")
+    async def _send_height(self, ws):
+        """Sends the latest height change to the server."""
+        height = self.pending_height
+        self.pending_height = None
+        self.sent_height = height
+        self.last_height_time = time.monotonic()
+        await ws.send(HEIGHT_MESSAGES[height])
 
     async def _gb_rx_processor_loop(self, ws):
         """Processes bytes received from the Game Boy and sends updates to the server."""
         try:
             while True:
-                rx = await self.gb_rx_queue.get()
+                timeout = None
+                if self.pending_height is not None:
+                    timeout = max(0, self.last_height_time + HEIGHT_UPDATE_INTERVAL - time.monotonic())
+                try:
+                    rx, rx_time = await asyncio.wait_for(self.gb_rx_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    # A coalesced height change is due
+                    if self.in_match: await self._send_height(ws)
+                    else: self.pending_height = None
+                    continue
                 if not self.in_match:
                     continue
                 
                 if rx < 0x14:  # Player's current stack height
-                    await ws.send(json.dumps({"type": "update", "height": rx}))
+                    now = time.monotonic()
+                    if rx != self.sent_height or (now - self.last_height_time) >= HEIGHT_REFRESH_INTERVAL:
+                        self.pending_height = rx
+                        if (now - self.last_height_time) >= HEIGHT_UPDATE_INTERVAL:
+                            await self._send_height(ws)
+                    else:
+                        # Back to the height the server already has
+                        self.pending_height = None
                 elif 0x80 <= rx <= 0x85:  # Lines cleared
-                    await ws.send(json.dumps({"type": "lines", "lines": rx}))
+                    await ws.send(LINES_MESSAGES[rx])
+                    self.line_latencies.append(time.monotonic() - rx_time)
                 elif rx == GB_WIN:  # Player won (cleared 30 lines)
-                    await ws.send(json.dumps({"type": "win"}))
+                    await ws.send(WIN_MESSAGE)
                     await self.end_match_from_server(won=True)
                 elif rx == GB_LOSE: # Player topped out (animation starting)
-                    await ws.send(json.dumps({"type": "dead"}))
+                    await ws.send(DEAD_MESSAGE)
                 elif rx == GB_FILL_DONE: # Player's top-out animation finished
                     print("[Game] Match ended. Player LOST (by top-out).")
                     self.in_match = False
                     
                     print("[GB] Sending finalization command...")
-                    async with self.link_lock:
-                        self.link.xfer_byte(CMD_FINAL)
-                        time.sleep(0.01)
+                    await self.io.run_sequence_async([(CMD_FINAL, 0.01)])
                     print("[GB] Finalization command sent.")
                     
+                    self.report_latency()
                     self.game_over_event.set()
         except asyncio.CancelledError:
             pass
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import random
+import string
+import time
+import uuid
+import websockets
+
+# Piece bytes of the Game Boy's 2-player mode (L, J, I, O, Z, S, T)
+PIECES = (0x00, 0x04, 0x08, 0x0C, 0x10, 0x14, 0x18)
+NUM_TILES = 256
+# A garbage row template: 10 cells, empty or block, with at least one hole
+GARBAGE_LEN = 10; GARBAGE_EMPTY = 0x2F; GARBAGE_BLOCK = 0x80;
+LOBBY_CODE_LEN = 4
+# Lobby state broadcasts are coalesced over this interval (seconds)
+GAME_INFO_INTERVAL = 0.05
+# Valid values sent by the clients: stack heights and line clear bytes
+MAX_HEIGHT = 0x13; MIN_LINES = 0x80; MAX_LINES = 0x85;
+# A client with this many unsent messages stopped reading, and is dropped
+MAX_OUTBOX = 256
+# Matches start this long after the host's request, so start_game reaches every player in time
+DEFAULT_START_DELAY = 0.5
+
+def get_int(data, key, low, high):
+    """Returns data[key] as an int, or None if it's missing, malformed or out of [low, high]."""
+    try: value = int(data.get(key))
+    except (TypeError, ValueError): return None
+    return value if low <= value <= high else None
+
+def make_tiles(rng):
+    return bytes(rng.choice(PIECES) for _ in range(NUM_TILES)).hex()
+
+def make_garbage(rng):
+    row = [GARBAGE_BLOCK] * GARBAGE_LEN
+    row[rng.randrange(GARBAGE_LEN)] = GARBAGE_EMPTY
+    return bytes(row).hex()
+
+class TetrisPlayer:
+    def __init__(self, ws):
+        self.ws = ws
+        # Messages go out in order through the writer, slow clients don't block the lobby
+        self.outbox = asyncio.Queue(MAX_OUTBOX)
+        self.uuid = str(uuid.uuid4())
+        self.name = ""
+        self.height = 0
+        self.num_wins = 0
+        self.alive = False
+        self.registered = False
+        self.dropped = False
+
+    def drop(self):
+        """Closes the connection, the handler then removes the player."""
+        if not self.dropped:
+            self.dropped = True
+            asyncio.ensure_future(self.ws.close())
+
+    async def writer(self):
+        try:
+            while True:
+                await self.ws.send(await self.outbox.get())
+        except websockets.ConnectionClosed:
+            pass
+
+    def info(self):
+        return {"uuid": self.uuid, "name": self.name, "height": self.height,
+                "num_wins": self.num_wins, "alive": self.alive}
+
+class TetrisLobby:
+    """One lobby: its players, the running match and the coalesced game_info broadcasts."""
+    def __init__(self, server, code):
+        self.server = server
+        self.code = code
+        self.players = []
+        self.host = None
+        self.in_match = False
+        self.info_pending = False
+
+    def send(self, player, msg):
+        try: player.outbox.put_nowait(msg)
+        except asyncio.QueueFull: player.drop()
+
+    def broadcast(self, msg, skip=None):
+        for player in self.players:
+            if player is not skip: self.send(player, msg)
+
+    def game_info(self):
+        return json.dumps({"type": "game_info", "name": self.code, "in_match": self.in_match,
+                           "users": [p.info() for p in self.players]})
+
+    def schedule_game_info(self):
+        """Broadcasts the lobby state, at most once per GAME_INFO_INTERVAL."""
+        if self.info_pending: return
+        self.info_pending = True
+        asyncio.get_running_loop().call_later(GAME_INFO_INTERVAL, self._flush_game_info)
+
+    def _flush_game_info(self):
+        self.info_pending = False
+        # Serialized once for every player
+        self.broadcast(self.game_info())
+
+    def add(self, player):
+        self.players.append(player)
+        if self.host is None: self.host = player
+        self.schedule_game_info()
+
+    def remove(self, player):
+        if player in self.players: self.players.remove(player)
+        if self.host is player: self.host = self.players[0] if self.players else None
+        if self.in_match and player.alive:
+            player.alive = False
+            self.check_match_end()
+        self.schedule_game_info()
+
+    def start(self, player):
+        if player is not self.host or self.in_match or not self.players: return
+        rng = self.server.rng
+        garbage = json.dumps({"type": "garbage", "garbage": make_garbage(rng)})
+        # start_at is on the server's clock, synced clients convert it with their time_sync offset
+        start_game = json.dumps({"type": "start_game", "tiles": make_tiles(rng),
+                                 "start_at": time.monotonic() + self.server.start_delay})
+        self.in_match = True
+        for p in self.players:
+            p.alive = True
+            p.height = 0
+        self.broadcast(garbage)
+        self.broadcast(start_game)
+        self.schedule_game_info()
+
+    def update(self, player, height):
+        if player.height != height:
+            player.height = height
+            self.schedule_game_info()
+
+    def lines(self, player, lines):
+        if not self.in_match: return
+        msg = json.dumps({"type": "lines", "lines": lines})
+        for p in self.players:
+            if p is not player and p.alive: self.send(p, msg)
+
+    def win(self, player):
+        """The player cleared 30 lines: everyone else lost."""
+        if not self.in_match: return
+        for p in self.players:
+            if p is not player and p.alive: self.send(p, json.dumps({"type": "dead"}))
+        self.end_match(player)
+
+    def dead(self, player):
+        if not self.in_match or not player.alive: return
+        player.alive = False
+        self.check_match_end()
+
+    def check_match_end(self):
+        alive = [p for p in self.players if p.alive]
+        if len(alive) == 1 and len(self.players) > 1:
+            self.send(alive[0], json.dumps({"type": "win"}))
+            self.end_match(alive[0])
+        elif not alive:
+            self.end_match(None)
+
+    def end_match(self, winner):
+        self.in_match = False
+        for p in self.players: p.alive = False
+        if winner is not None: winner.num_wins += 1
+        self.schedule_game_info()
+
+class TetrisLobbyServer:
+    """
+    Stand-in for the Tetris lobby server, for LAN play and load tests.
+    It speaks the protocol TetrisLink uses: /create and /join/{code}.
+    time_sync requests are answered with the server's clock, for scheduled starts.
+    Unlike the real server, the line bytes are relayed as the clients sent them,
+    a 30 lines win ends the match with dead for the others instead of
+    reached_30_lines, and each match starts with a single garbage row.
+    """
+    def __init__(self, seed=None, start_delay=DEFAULT_START_DELAY):
+        self.lobbies = {}
+        self.rng = random.Random(seed)
+        self.start_delay = start_delay
+
+    def new_code(self):
+        while True:
+            code = "".join(self.rng.choice(string.ascii_uppercase) for _ in range(LOBBY_CODE_LEN))
+            if code not in self.lobbies: return code
+
+    def get_lobby(self, path):
+        path = path.rstrip("/")
+        if path == "/create":
+            code = self.new_code()
+            self.lobbies[code] = TetrisLobby(self, code)
+            return self.lobbies[code]
+        if path.startswith("/join/"):
+            return self.lobbies.get(path[len("/join/"):].upper())
+        return None
+
+    async def handler(self, ws, path=None):
+        if path is None:
+            request = getattr(ws, "request", None)
+            path = request.path if request is not None else ws.path
+        lobby = self.get_lobby(path)
+        if lobby is None:
+            try: await ws.send(json.dumps({"type": "error", "msg": "Lobby not found"}))
+            except websockets.ConnectionClosed: pass
+            return
+        player = TetrisPlayer(ws)
+        writer = asyncio.create_task(player.writer())
+        try:
+            async for msg in ws:
+                try: data = json.loads(msg)
+                except ValueError: continue
+                if not isinstance(data, dict): continue
+                msg_type = data.get("type")
+                if msg_type == "register" and not player.registered:
+                    player.registered = True
+                    player.name = str(data.get("name", ""))
+                    lobby.send(player, json.dumps({"type": "user_info", "uuid": player.uuid, "time_sync": True}))
+                    lobby.add(player)
+                elif not player.registered: continue
+                elif msg_type == "time_sync":
+                    lobby.send(player, json.dumps({"type": "time_sync", "client_time": data.get("client_time"),
+                                                   "server_time": time.monotonic()}))
+                elif msg_type == "update":
+                    height = get_int(data, "height", 0, MAX_HEIGHT)
+                    if height is not None: lobby.update(player, height)
+                elif msg_type == "lines":
+                    lines = get_int(data, "lines", MIN_LINES, MAX_LINES)
+                    if lines is not None: lobby.lines(player, lines)
+                elif msg_type == "start": lobby.start(player)
+                elif msg_type == "win": lobby.win(player)
+                elif msg_type == "dead": lobby.dead(player)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            writer.cancel()
+            lobby.remove(player)
+            if not lobby.players: self.lobbies.pop(lobby.code, None)
+
+    def listen(self, host, port):
+        """Returns the websockets server, to be used with async with."""
+        return websockets.serve(self.handler, host, port, compression=None)
+
+    async def serve(self, host, port):
+        async with self.listen(host, port):
+            print(f"Tetris lobby server listening on ws://{host}:{port}")
+            await asyncio.Future()
@@ -0,0 +1,346 @@
+import asyncio
+import contextlib
+import json
+import os
+import random
+import threading
+import time
+import websockets
+from .tetris_link import TetrisLink, CMD_MASTER_READY, RESP_READY, CMD_START_A, CMD_GO_1, CMD_FINAL, \
+    WIN_CODE, LOSE_CODE, GB_WIN, GB_LOSE, GB_FILL_DONE, DEFAULT_FRAMES_PER_POLL
+from .tetris_lobby_server import TetrisLobbyServer
+
+# States of the simulated Game Boy
+SIM_MENU = 0; SIM_STARTING = 1; SIM_PLAYING = 2; SIM_TOPPING = 3; SIM_ENDING = 4;
+# Bytes the start sequence sends after CMD_GO_1 before the match runs
+GO_BYTES = 4
+TOP_HEIGHT = 0x13; LINES_TO_WIN = 30; LINES_BASE = 0x80;
+# Chance of a piece clearing lines, and how many lines it clears
+CLEAR_CHANCE = 0.3; CLEAR_WEIGHTS = (50, 30, 15, 5);
+# Garbage rows received for each lines byte, as in the Game Boy's 2-player mode
+GARBAGE_ROWS = (0, 0, 1, 2, 4, 4)
+DEFAULT_PIECE_TIME = 0.25; FILL_TIME = 1.0; DEFAULT_TIMEOUT = 300;
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+class TetrisSimGB:
+    """
+    Software Game Boy for TetrisLink. It answers the link like Tetris' 2-player
+    mode and plays a random match on a wall-clock schedule, so it behaves the
+    same at any poll rate. Match starts, line clears and received garbage are
+    reported to the observer, with the time they crossed the link.
+    """
+    def __init__(self, rng, piece_time=DEFAULT_PIECE_TIME, observer=None):
+        self.rng = rng
+        self.piece_time = piece_time
+        self.observer = observer
+        self.state = SIM_MENU
+        self.go_left = 0
+        self.start_time = None
+        self.match = 0
+        self.out = []
+
+    def set_mode(self, mode): pass
+    def deinit(self): pass
+
+    def _start_match(self, now):
+        self.state = SIM_PLAYING
+        self.start_time = now
+        self.match += 1
+        self.height = 0
+        self.lines = 0
+        self.out = []
+        self.next_piece = now + self.piece_time
+        if self.observer: self.observer.on_start(self, now)
+
+    def _place_piece(self, now):
+        if self.rng.random() < CLEAR_CHANCE:
+            cleared = self.rng.choices((1, 2, 3, 4), CLEAR_WEIGHTS)[0]
+            self.height = max(0, self.height - cleared)
+            self.lines += cleared
+            self.out.append(LINES_BASE + cleared)
+            if self.lines >= LINES_TO_WIN:
+                self.out.append(GB_WIN)
+                self.state = SIM_ENDING
+        else:
+            self.height += 1
+        if self.state == SIM_PLAYING and self.height > TOP_HEIGHT:
+            self.height = TOP_HEIGHT
+            self.out.append(GB_LOSE)
+            self.state = SIM_TOPPING
+            self.fill_done = now + FILL_TIME
+
+    def _play(self, out_b, now):
+        if out_b in (WIN_CODE, LOSE_CODE):
+            # Forced end from the master, only CMD_FINAL is left
+            self.state = SIM_ENDING
+            self.out = []
+            return 0
+        if LINES_BASE <= out_b <= LINES_BASE + 5:
+            if self.observer: self.observer.on_garbage(self, out_b, now)
+            self.height += GARBAGE_ROWS[out_b - LINES_BASE]
+        if self.state == SIM_PLAYING:
+            while now >= self.next_piece and self.state == SIM_PLAYING:
+                self._place_piece(now)
+                self.next_piece += self.piece_time
+        elif now >= self.fill_done:
+            self.out.append(GB_FILL_DONE)
+            self.state = SIM_ENDING
+        return self._next_out(now, min(self.height, TOP_HEIGHT))
+
+    def _next_out(self, now, default):
+        if not self.out: return default
+        byte = self.out.pop(0)
+        if LINES_BASE <= byte <= LINES_BASE + 5 and self.observer:
+            self.observer.on_lines(self, byte, now)
+        return byte
+
+    def xfer_byte(self, out_b):
+        now = time.monotonic()
+        if self.state == SIM_MENU:
+            if out_b == CMD_START_A:
+                self.state = SIM_STARTING
+                self.go_left = 0
+            return RESP_READY if out_b == CMD_MASTER_READY else 0
+        if self.state == SIM_STARTING:
+            if self.go_left:
+                self.go_left -= 1
+                if not self.go_left: self._start_match(now)
+            elif out_b == CMD_GO_1:
+                self.go_left = GO_BYTES
+            return 0
+        if self.state == SIM_ENDING:
+            if out_b == CMD_FINAL:
+                self.state = SIM_MENU
+            # The win byte may still be waiting for the link
+            return self._next_out(now, 0)
+        return self._play(out_b, now)
+
+class TetrisBenchSocket:
+    """
+    Counts the messages a client exchanges with the server. It can also
+    delay them by a fixed one-way time in both directions, like a slower
+    network, keeping them in order.
+    """
+    def __init__(self, ws, stats, delay=0):
+        self.ws = ws
+        self.stats = stats
+        self.delay = delay
+        self.tasks = []
+        if delay:
+            self.inbox = asyncio.Queue()
+            self.outbox = asyncio.Queue()
+            self.tasks = [asyncio.create_task(self._reader()), asyncio.create_task(self._writer())]
+
+    def close(self):
+        for task in self.tasks: task.cancel()
+
+    async def _reader(self):
+        try:
+            while True:
+                msg = await self.ws.recv()
+                self.inbox.put_nowait((time.monotonic() + self.delay, msg))
+        except websockets.ConnectionClosed as e:
+            self.inbox.put_nowait((time.monotonic() + self.delay, e))
+
+    async def _writer(self):
+        while True:
+            due, msg = await self.outbox.get()
+            await asyncio.sleep(max(0, due - time.monotonic()))
+            await self.ws.send(msg)
+
+    async def send(self, msg):
+        self.stats.sent += 1
+        if self.delay: self.outbox.put_nowait((time.monotonic() + self.delay, msg))
+        else: await self.ws.send(msg)
+
+    async def recv(self):
+        if self.delay:
+            due, msg = await self.inbox.get()
+            await asyncio.sleep(max(0, due - time.monotonic()))
+            if isinstance(msg, Exception): raise msg
+        else:
+            msg = await self.ws.recv()
+        self.stats.received += 1
+        self.stats.received_bytes += len(msg)
+        return msg
+
+class TetrisBenchLobby:
+    """
+    One lobby of simulated players. It pairs each line clear with the
+    garbage it caused on the opponents, in order, within the same match,
+    and collects when each match started on each player.
+    The sims call it from their link threads.
+    """
+    def __init__(self, bench):
+        self.bench = bench
+        self.players = []
+        self.lock = threading.Lock()
+        self.pending = []
+        self.starts = {}
+
+    def on_start(self, sim, now):
+        with self.lock: self.starts.setdefault(sim.match, []).append(now)
+
+    def start_skews(self):
+        """Time between the first and the last player starting, for each match everyone started."""
+        return [max(starts) - min(starts) for starts in self.starts.values() if len(starts) == len(self.players)]
+
+    def on_lines(self, sim, byte, now):
+        with self.lock:
+            opponents = set(p.link for p in self.players if p.link is not sim)
+            self.pending.append((now, sim.match, byte, opponents))
+
+    def on_garbage(self, sim, byte, now):
+        with self.lock:
+            for entry in self.pending:
+                sent, match, sent_byte, waiting = entry
+                if match == sim.match and sent_byte == byte and sim in waiting:
+                    waiting.discard(sim)
+                    if not waiting: self.pending.remove(entry)
+                    self.bench.line_latencies.append(now - sent)
+                    return
+
+class TetrisBenchLink(TetrisLink):
+    """TetrisLink which plays a fixed number of rounds without user input."""
+    def __init__(self, bench, lobby, sim):
+        super().__init__(sim, bench.frames_per_poll, bench.sync_start)
+        self.bench = bench
+        self.lobby = lobby
+        self.rounds_done = 0
+
+    def report_latency(self):
+        self.bench.missed_polls += self.io.missed_polls
+        super().report_latency()
+
+    def clock_ready(self):
+        return not (self.sync_start and self.server_time_sync) or self.clock_offset is not None
+
+    def lobby_code(self):
+        if self.last_game_info is None: return None
+        return json.loads(self.last_game_info).get("name")
+
+    async def _host_game_loop(self, ws):
+        for i in range(self.bench.rounds):
+            self.game_over_event.clear()
+            # Everyone joined, synced their clock and finished the last round
+            while len(self.latest_users) < len(self.lobby.players) or \
+                  any(p.rounds_done < i or p.in_match or not p.clock_ready() for p in self.lobby.players):
+                await asyncio.sleep(0.05)
+            await ws.send(json.dumps({"type": "start"}))
+            await self.game_over_event.wait()
+            self.rounds_done += 1
+
+    async def _join_game_loop(self, ws):
+        for _ in range(self.bench.rounds):
+            self.game_over_event.clear()
+            await self.game_over_event.wait()
+            self.rounds_done += 1
+
+class TetrisBench:
+    """
+    Load generator: runs lobbies of simulated players against a server,
+    by default a local TetrisLobbyServer, and reports the message rates,
+    the latency from a line clear to the opponents' garbage and how far
+    apart the players of a lobby started each match.
+    """
+    def __init__(self, players, lobby_size=2, rounds=1, server_url=None, piece_time=DEFAULT_PIECE_TIME,
+                 frames_per_poll=DEFAULT_FRAMES_PER_POLL, seed=None, timeout=DEFAULT_TIMEOUT, verbose=False,
+                 sync_start=True, latency=0):
+        self.num_players = players
+        self.lobby_size = lobby_size
+        self.rounds = rounds
+        self.server_url = server_url
+        self.piece_time = piece_time
+        self.frames_per_poll = frames_per_poll
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.timeout = timeout
+        self.timed_out = False
+        self.verbose = verbose
+        self.sync_start = sync_start
+        # Each player gets a one-way network delay up to this
+        self.latency = latency
+        self.sent = 0
+        self.received = 0
+        self.received_bytes = 0
+        self.missed_polls = 0
+        self.line_latencies = []
+        self.lobbies = []
+        self.duration = 0
+
+    async def _run_player(self, player, url, host_mode):
+        delay = self.rng.uniform(0, self.latency)
+        try:
+            await player.handshake()
+            await player.prepare_after_handshake()
+            async with websockets.connect(url, compression=None) as ws:
+                socket = TetrisBenchSocket(ws, self, delay)
+                try: await player.run(socket, host_mode)
+                finally: socket.close()
+        finally:
+            player.close()
+
+    async def _run_lobby(self, url, size):
+        lobby = TetrisBenchLobby(self)
+        for _ in range(size):
+            sim = TetrisSimGB(random.Random(self.rng.random()), self.piece_time, lobby)
+            lobby.players.append(TetrisBenchLink(self, lobby, sim))
+        self.lobbies.append(lobby)
+        host = lobby.players[0]
+        tasks = [asyncio.create_task(self._run_player(host, url + "/create", True))]
+        while host.lobby_code() is None:
+            if tasks[0].done(): return await tasks[0]
+            await asyncio.sleep(0.05)
+        for player in lobby.players[1:]:
+            tasks.append(asyncio.create_task(self._run_player(player, f"{url}/join/{host.lobby_code()}", False)))
+        await asyncio.gather(*tasks)
+
+    async def _run_lobbies(self, url):
+        sizes = [self.lobby_size] * (self.num_players // self.lobby_size)
+        if self.num_players % self.lobby_size: sizes.append(self.num_players % self.lobby_size)
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.gather(*[self._run_lobby(url, size) for size in sizes]), self.timeout)
+        except asyncio.TimeoutError:
+            # What was measured until then is still reported
+            self.timed_out = True
+        finally:
+            self.duration = time.monotonic() - start
+
+    async def run(self):
+        with contextlib.ExitStack() as stack:
+            if not self.verbose:
+                # TetrisLink's logs, from hundreds of players
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            if self.server_url is not None:
+                await self._run_lobbies(self.server_url)
+            else:
+                async with TetrisLobbyServer(self.seed).listen("127.0.0.1", 0) as server:
+                    port = list(server.sockets)[0].getsockname()[1]
+                    await self._run_lobbies(f"ws://127.0.0.1:{port}")
+
+    def report(self):
+        duration = max(self.duration, 1e-9)
+        print(f"Players: {self.num_players} in {len(self.lobbies)} lobbies, {self.rounds} rounds, "
+              f"up to {self.latency * 1000:.0f} ms of one-way latency, {self.duration:.1f} s"
+              + (" (timed out)" if self.timed_out else ""))
+        print(f"Messages: {self.sent} sent ({self.sent / duration:.0f}/s), {self.received} received "
+              f"({self.received / duration:.0f}/s, {self.received_bytes / duration / 1024:.1f} KiB/s)")
+        latencies = sorted(self.line_latencies)
+        undelivered = sum(len(entry[3]) for lobby in self.lobbies for entry in lobby.pending)
+        if latencies:
+            print(f"Lines -> garbage: {len(latencies)} events, avg {sum(latencies) / len(latencies) * 1000:.1f} ms, "
+                  f"p50 {percentile(latencies, 0.5) * 1000:.1f} ms, p95 {percentile(latencies, 0.95) * 1000:.1f} ms, "
+                  f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms "
+                  f"({undelivered} never delivered)")
+        else:
+            print("Lines -> garbage: no events")
+        skews = sorted(skew for lobby in self.lobbies for skew in lobby.start_skews())
+        if skews:
+            print(f"Start skew ({'synced' if self.sync_start else 'not synced'}): {len(skews)} matches, "
+                  f"p50 {percentile(skews, 0.5) * 1000:.2f} ms, p95 {percentile(skews, 0.95) * 1000:.2f} ms, "
+                  f"max {skews[-1] * 1000:.2f} ms")
+        print(f"Polls missed: {self.missed_polls}")
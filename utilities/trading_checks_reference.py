@@ -0,0 +1,96 @@
+from .gsc_trading_data_utils import GSCUtilsMisc, GSCChecksMap
+from .rse_sp_trading_data_utils import RSESPUtils, RSESPTradingPokémonInfo, RSESPTradingData
+
+class TradingChecksReference:
+    """
+    Class which contains the reference path the checks are compared
+    against, and the data used to do it. Shared by the differential test
+    and checks_bench.py.
+    The reference calls the decorated single-byte checks one by one,
+    like the code did before the runs and the identity map.
+    """
+    rse_base_path = "useful_data/rse/base.bin"
+    rse_section_sizes = [0x380]
+    rse_max_species = 411
+    rse_max_move = 354
+
+    def random_section(rnd, length):
+        # Terminators and empty values are common in real sections
+        return [rnd.choice([0, 0xFF, 0x50, rnd.randrange(0x100)]) for _ in range(length)]
+
+    def reset(checks):
+        checks.reset_species_item_list()
+        checks.prepare_text_buffer()
+        checks.prepare_patch_sets_buffer()
+        checks.prepare_species_buffer()
+        checks.team_size = 6
+
+    def reference_checks(checks_class, section_sizes, do_sanity_checks):
+        """
+        Returns checks whose maps call the decorated functions,
+        even with the sanity checks off.
+        """
+        checks = checks_class(section_sizes, True)
+        checks.do_sanity_checks = do_sanity_checks
+        return checks
+
+    def per_byte(checks, checker, data):
+        new_data = list(data)
+        for i in range(len(checker)):
+            new_data[i] = checker[i](data[i])
+        return new_data
+
+    def runs(checks, checker, data):
+        return checks.apply_checks_to_data(checker, data)
+
+    def clip_checker(checker, length):
+        """
+        Returns the checker for the first length bytes only.
+        """
+        runs = [(start, min(end, length), run_check) for start, end, run_check in checker.runs if start < length]
+        return GSCChecksMap(checker[:length], runs, is_identity=checker.is_identity)
+
+    def random_rse_mon(rnd):
+        """
+        Returns the data of a random, valid Gen 3 pokémon.
+        """
+        utils_class = RSESPUtils
+        species = rnd.randrange(1, TradingChecksReference.rse_max_species + 1)
+        while not utils_class.is_species_valid(species, utils_class):
+            species = rnd.randrange(1, TradingChecksReference.rse_max_species + 1)
+        growth = [0] * utils_class.substructure_len
+        attacks = [0] * utils_class.substructure_len
+        evs = [0] * utils_class.substructure_len
+        misc = [0] * utils_class.substructure_len
+        GSCUtilsMisc.write_short_le(growth, 0, species)
+        for i in range(4):
+            GSCUtilsMisc.write_short_le(attacks, i * 2, rnd.randrange(1, TradingChecksReference.rse_max_move + 1))
+        for i in range(6):
+            evs[i] = rnd.randrange(0x100)
+        GSCUtilsMisc.write_int_le(misc, 4, rnd.randrange(1 << 30))
+        # An even PID goes with the first ability, which is always valid
+        pid = rnd.randrange(1 << 31) * 2
+        ot_id = rnd.randrange(1 << 32)
+        values = [0] * RSESPTradingPokémonInfo.pokemon_data_len
+        GSCUtilsMisc.write_int_le(values, RSESPTradingPokémonInfo.pid_pos, pid)
+        GSCUtilsMisc.write_int_le(values, RSESPTradingPokémonInfo.ot_id_pos, ot_id)
+        encrypted_data, checksum = utils_class.encrypt_substructures([growth, attacks, evs, misc], pid, ot_id, utils_class)
+        values[RSESPTradingPokémonInfo.enc_data_pos:RSESPTradingPokémonInfo.enc_data_pos + RSESPTradingPokémonInfo.enc_data_len] = encrypted_data
+        GSCUtilsMisc.write_short_le(values, RSESPTradingPokémonInfo.checksum_pos, checksum)
+        mon = RSESPTradingPokémonInfo(values, 0)
+        mon.set_level(rnd.randrange(utils_class.min_level, utils_class.max_level + 1))
+        mon.encrypt_data()
+        return mon.values
+
+    def random_rse_section(rnd):
+        """
+        Returns a valid Gen 3 trading section with a random party.
+        """
+        data = GSCUtilsMisc.read_data(TradingChecksReference.rse_base_path)
+        party_size = rnd.randrange(1, RSESPTradingData.trading_party_max_size + 1)
+        GSCUtilsMisc.write_int_le(data, RSESPTradingData.trading_party_info_pos, party_size)
+        for i in range(party_size):
+            pos = RSESPTradingData.trading_pokemon_pos + (i * RSESPTradingData.trading_pokemon_length)
+            data[pos:pos + RSESPTradingData.trading_pokemon_length] = TradingChecksReference.random_rse_mon(rnd)
+        RSESPTradingData.generate_checksum(RSESPTradingData, data, TradingChecksReference.rse_section_sizes)
+        return data
@@ -0,0 +1,171 @@
+import os
+import threading
+from bisect import bisect_left
+from time import sleep
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class TradingMetricsCounter:
+    """
+    Class which contains a monotonic counter.
+    Some counters are updated by more than one thread (the trade,
+    the pool prefetcher and the buffered negotiator), so each thread
+    adds to its own cell without locking, and rendering sums the cells.
+    The lock is only taken when a thread updates the counter for the
+    first time, and while rendering.
+    """
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.local = threading.local()
+        self.cells = []
+        self.lock = threading.Lock()
+
+    def get_cell(self):
+        cell = getattr(self.local, "cell", None)
+        if cell is None:
+            cell = [0]
+            self.local.cell = cell
+            with self.lock:
+                self.cells.append(cell)
+        return cell
+
+    def inc(self, amount=1):
+        try:
+            self.local.cell[0] += amount
+        except AttributeError:
+            self.get_cell()[0] += amount
+
+    def get_value(self):
+        with self.lock:
+            return sum([cell[0] for cell in self.cells])
+
+    def render(self, prefix):
+        name = prefix + self.name
+        return ["# HELP " + name + " " + self.help, "# TYPE " + name + " counter", name + " " + str(self.get_value())]
+
+class TradingMetricsHistogram:
+    """
+    Class which contains a histogram with fixed buckets.
+    Like the counters, each thread updates its own bucket counts
+    and sum, and rendering adds them up.
+    """
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.local = threading.local()
+        self.cells = []
+        self.lock = threading.Lock()
+
+    def get_cell(self):
+        cell = getattr(self.local, "cell", None)
+        if cell is None:
+            # Bucket counts, then the sum
+            cell = [0] * (len(self.buckets) + 2)
+            self.local.cell = cell
+            with self.lock:
+                self.cells.append(cell)
+        return cell
+
+    def observe(self, value):
+        cell = self.get_cell()
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def render(self, prefix):
+        name = prefix + self.name
+        ret = ["# HELP " + name + " " + self.help, "# TYPE " + name + " histogram"]
+        counts = [0] * (len(self.buckets) + 2)
+        with self.lock:
+            for cell in self.cells:
+                for i in range(len(cell)):
+                    counts[i] += cell[i]
+        total = 0
+        for i in range(len(self.buckets)):
+            total += counts[i]
+            ret += [name + "_bucket{le=\"" + str(self.buckets[i]) + "\"} " + str(total)]
+        total += counts[len(self.buckets)]
+        ret += [name + "_bucket{le=\"+Inf\"} " + str(total)]
+        ret += [name + "_sum " + str(counts[-1])]
+        ret += [name + "_count " + str(total)]
+        return ret
+
+class TradingMetricsHandler(BaseHTTPRequestHandler):
+    """
+    Class which answers the metrics' HTTP requests.
+    """
+
+    def do_GET(self):
+        data = TradingMetrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", TradingMetrics.content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class TradingMetrics:
+    """
+    Class which contains the session's metrics and exposes them
+    in the Prometheus text format.
+    """
+    prefix = "gblink_"
+    content_type = "text/plain; version=0.0.4"
+    host = "127.0.0.1"
+    textfile_timer = 5
+    # Updates are skipped by their callers unless the metrics are exposed
+    enabled = False
+
+    link_transfers = TradingMetricsCounter("link_transfers_total", "Transfers done with the device.")
+    link_bytes = TradingMetricsCounter("link_bytes_total", "Bytes swapped with the device.")
+    byte_drops = TradingMetricsCounter("link_byte_drops_total", "Dropped bytes detected while exchanging sections.")
+    get_requests = TradingMetricsCounter("get_requests_total", "GETs issued while waiting for data.")
+    received_messages = TradingMetricsCounter("received_messages_total", "Messages received from the server.")
+    invalid_messages = TradingMetricsCounter("invalid_messages_total", "Received messages which were discarded.")
+    sections = TradingMetricsCounter("sections_completed_total", "Data sections exchanged with the device.")
+    trades = TradingMetricsCounter("trades_completed_total", "Trades completed successfully.")
+    websocket_rtt = TradingMetricsHistogram("websocket_rtt_seconds", "Round trip time of the server's connection.",
+                                            [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5])
+    section_time = TradingMetricsHistogram("section_seconds", "Time needed to exchange a data section with the device.",
+                                           [0.5, 1, 2, 5, 10, 20, 30, 60, 120])
+    metrics = [link_transfers, link_bytes, byte_drops, get_requests, received_messages, invalid_messages,
+               sections, trades, websocket_rtt, section_time]
+
+    def render():
+        ret = []
+        for metric in TradingMetrics.metrics:
+            ret += metric.render(TradingMetrics.prefix)
+        return "\n".join(ret) + "\n"
+
+    def write_textfile(path):
+        """
+        Writes the metrics for a textfile collector.
+        The file is replaced at once, so it's never read half-written.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(TradingMetrics.render())
+        os.replace(tmp_path, path)
+
+    def textfile_writer(path):
+        while True:
+            TradingMetrics.write_textfile(path)
+            sleep(TradingMetrics.textfile_timer)
+
+    def start(port=None, path=None):
+        """
+        Exposes the metrics through a local HTTP endpoint,
+        a textfile, or both.
+        """
+        if port is not None:
+            server = ThreadingHTTPServer((TradingMetrics.host, port), TradingMetricsHandler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            TradingMetrics.enabled = True
+        if path is not None:
+            threading.Thread(target=TradingMetrics.textfile_writer, args=(path,), daemon=True).start()
+            TradingMetrics.enabled = True
@@ -0,0 +1,84 @@
+import os
+import sys
+import threading
+import time
+
+class TradingProfiler(threading.Thread):
+    """
+    Class which samples the stack of a thread at a fixed rate,
+    and writes it in the collapsed format used by flame graphs.
+    Samples taken while the thread was sleeping end with idle_marker,
+    so idle time and CPU time can be told apart.
+    """
+    interval = 0.01
+    write_timer = 10
+    idle_marker = "[sleep]"
+    idle_functions = set(["sleep_func"])
+    idle_cpu_ratio = 0.5
+
+    def __init__(self, path, thread_id=None):
+        threading.Thread.__init__(self)
+        self.daemon=True
+        self.path = path
+        self.thread_id = thread_id
+        if self.thread_id is None:
+            self.thread_id = threading.main_thread().ident
+        self.stacks = {}
+        try:
+            self.cpu_clock = time.pthread_getcpuclockid(self.thread_id)
+        except (AttributeError, OSError):
+            self.cpu_clock = None
+
+    def get_cpu_time(self):
+        if self.cpu_clock is None:
+            return None
+        return time.clock_gettime(self.cpu_clock)
+
+    def get_stack(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack += [os.path.basename(code.co_filename) + ":" + code.co_name]
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def sample(self, is_idle):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        stack = self.get_stack(frame)
+        # The sleeping C function has no frame, so the caller is checked
+        if is_idle or (frame.f_code.co_name in self.idle_functions):
+            stack += [self.idle_marker]
+        key = ";".join(stack)
+        self.stacks[key] = self.stacks.get(key, 0) + 1
+
+    def write(self):
+        """
+        Rewrites the whole file, since the process may be killed
+        at any moment.
+        """
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            for key, count in list(self.stacks.items()):
+                f.write(key + " " + str(count) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def run(self):
+        last_write = time.monotonic()
+        last_time = last_write
+        last_cpu = self.get_cpu_time()
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            cpu = self.get_cpu_time()
+            is_idle = False
+            if cpu is not None:
+                is_idle = (cpu - last_cpu) < ((now - last_time) * self.idle_cpu_ratio)
+            last_time = now
+            last_cpu = cpu
+            self.sample(is_idle)
+            if (now - last_write) >= self.write_timer:
+                self.write()
+                last_write = now
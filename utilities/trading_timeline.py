@@ -0,0 +1,76 @@
+import json
+import os
+import queue
+import threading
+import time
+
+class TradingTimeline:
+    """
+    Class which writes a JSONL timeline of the session's phases.
+    Each entry has the time waited on the device, on the other
+    player (or the server) and the local CPU time.
+    The entries are written by a background thread, so the link
+    loop never waits on the disk.
+    """
+    enabled = False
+    entries = None
+    session = None
+    session_start = 0
+    trade = 0
+    phase = None
+    console_time = 0
+    peer_time = 0
+
+    def start(path=None):
+        if path is None:
+            return
+        TradingTimeline.entries = queue.Queue()
+        TradingTimeline.session = str(os.getpid()) + "-" + str(int(time.time()))
+        TradingTimeline.session_start = time.monotonic()
+        threading.Thread(target=TradingTimeline.writer, args=(path,), daemon=True).start()
+        TradingTimeline.enabled = True
+
+    def writer(path):
+        with open(path, "a") as f:
+            while True:
+                entry = TradingTimeline.entries.get()
+                f.write(json.dumps(entry) + "\n")
+                if TradingTimeline.entries.empty():
+                    f.flush()
+
+    def begin(name, **info):
+        """
+        Starts a new phase. The previous one ends with it.
+        """
+        if not TradingTimeline.enabled:
+            return
+        TradingTimeline.end()
+        TradingTimeline.phase = [name, info, time.monotonic(), time.thread_time(), TradingTimeline.console_time, TradingTimeline.peer_time]
+
+    def end():
+        if (not TradingTimeline.enabled) or (TradingTimeline.phase is None):
+            return
+        name, info, start, start_cpu, start_console, start_peer = TradingTimeline.phase
+        TradingTimeline.phase = None
+        entry = {"session": TradingTimeline.session, "trade": TradingTimeline.trade, "phase": name,
+                 "start": round(start - TradingTimeline.session_start, 6),
+                 "duration": round(time.monotonic() - start, 6),
+                 "console": round(TradingTimeline.console_time - start_console, 6),
+                 "peer": round(TradingTimeline.peer_time - start_peer, 6),
+                 "cpu": round(time.thread_time() - start_cpu, 6)}
+        entry.update(info)
+        TradingTimeline.entries.put(entry)
+
+    def next_trade():
+        TradingTimeline.trade += 1
+
+    def start_peer_wait():
+        return [time.monotonic(), TradingTimeline.console_time]
+
+    def end_peer_wait(wait):
+        """
+        The device is only kept running while waiting on the other side,
+        so all of the time counts as waiting on it.
+        """
+        TradingTimeline.peer_time += time.monotonic() - wait[0]
+        TradingTimeline.console_time = wait[1]
@@ -4,8 +4,10 @@ class TradingVersion:
     """
 
     version_major = 4
-    version_minor = 0
+    version_minor = 1
     version_build = 0
+    compression_capability = 0x0001
+    capabilities = compression_capability
     
     def read_version_data(data):
         ret = []
@@ -13,6 +15,15 @@ class TradingVersion:
             ret += [data[i * 2] + (data[(i * 2) + 1] << 8)]
         return ret
     
+    def read_capabilities_data(data):
+        return data[0] + (data[1] << 8)
+    
+    def supports_compression(capabilities):
+        return (capabilities & TradingVersion.compression_capability) != 0
+    
+    def prepare_capabilities_data():
+        return [TradingVersion.capabilities & 0xFF, (TradingVersion.capabilities >> 8) & 0xFF]
+    
     def prepare_version_data():
         ret = []
         ret += [TradingVersion.version_major & 0xFF, (TradingVersion.version_major >> 8) & 0xFF]
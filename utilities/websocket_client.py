@@ -3,9 +3,10 @@
 import asyncio
 import websockets
 import threading
-from time import sleep
+from time import sleep, monotonic
 from .gsc_trading_strings import GSCTradingStrings
 from .high_level_listener import HighLevelListener
+from .trading_metrics import TradingMetrics
 
 class ProxyConnectionRunner (threading.Thread):
     """
@@ -49,6 +50,7 @@ class WebsocketClient:
     host = None
     port = None
     SLEEP_TIMER = 0.01
+    RTT_TIMER = 5
     
     def __init__(self, host, port, kill_function):
         WebsocketClient.host = host
@@ -89,15 +91,38 @@ class WebsocketClient:
             else:
                 await asyncio.sleep(WebsocketClient.SLEEP_TIMER)
 
+    async def rtt_handler(websocket):
+        """
+        Measures the connection's round trip time with pings.
+        It stops once the connection is closed, or if a ping fails.
+        """
+        try:
+            while True:
+                await asyncio.sleep(WebsocketClient.RTT_TIMER)
+                start = monotonic()
+                pong_waiter = await websocket.ping()
+                await pong_waiter
+                TradingMetrics.websocket_rtt.observe(monotonic() - start)
+        except websockets.ConnectionClosed:
+            pass
+        except Exception as e:
+            print(GSCTradingStrings.websocket_rtt_error_str, str(e))
+
     async def handler(websocket, other, loop):
         consumer_task = loop.create_task(WebsocketClient.consumer_handler(websocket, other))
         producer_task = loop.create_task(WebsocketClient.producer_handler(websocket, other))
+        # The pings only feed the metrics, so they don't end the session when they stop
+        rtt_task = None
+        if TradingMetrics.enabled:
+            rtt_task = loop.create_task(WebsocketClient.rtt_handler(websocket))
         done, pending = await asyncio.wait(
             [consumer_task, producer_task],
             return_when=asyncio.FIRST_COMPLETED,
         )
         for task in pending:
             task.cancel()
+        if rtt_task is not None:
+            rtt_task.cancel()
         WebsocketClient.kill_function()
 
     async def server_connect(other, loop, gen):